@@ -20,6 +20,18 @@ app.conf.beat_schedule = {
         'task': 'django_weather_reminder.tasks.fill_active_cities',
         'schedule': crontab(hour='*', minute='0')
     },
+    'fill-forecasts-every-3-hours': {
+        'task': 'django_weather_reminder.tasks.fill_active_cities_forecasts',
+        'schedule': crontab(hour='*/3', minute='15')
+    },
+    'create-forecast-partitions-every-night': {
+        'task': 'django_weather_reminder.tasks.create_forecast_partitions',
+        'schedule': crontab(hour='1', minute='0')
+    },
+    'apply-forecast-retention-every-night': {
+        'task': 'django_weather_reminder.tasks.apply_forecast_retention',
+        'schedule': crontab(hour='1', minute='30')
+    },
     'send-mail-every-hour': {
         'task': 'django_weather_reminder.tasks.send_mail_every_n_hours',
         'schedule': crontab(hour='*', minute='5'),
@@ -14,6 +14,7 @@ from pathlib import Path
 from datetime import timedelta
 
 import os
+import tempfile
 
 import environ
 
@@ -182,6 +183,26 @@ REST_FRAMEWORK = {
     )
 }
 
+# Scheme and host of the page links of the paginated lists. If empty,
+# they are taken from the Host header of every request.
+API_BASE_URL = os.getenv('API_BASE_URL', 'http://localhost:8000')
+# Default and maximum number of items on a page of the paginated lists.
+API_PAGE_SIZE = int(os.getenv('API_PAGE_SIZE', 100))
+API_MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', 1000))
+# Default and maximum number of cities returned by the city search.
+CITY_SEARCH_LIMIT = int(os.getenv('CITY_SEARCH_LIMIT', 10))
+CITY_SEARCH_MAX_LIMIT = int(os.getenv('CITY_SEARCH_MAX_LIMIT', 50))
+# Default and maximum number of cities returned by the nearest cities.
+NEAREST_CITIES_LIMIT = int(os.getenv('NEAREST_CITIES_LIMIT', 5))
+NEAREST_CITIES_MAX_LIMIT = int(os.getenv('NEAREST_CITIES_MAX_LIMIT', 50))
+# Default and maximum number of days of the city forecast history,
+# and number of forecasts serialized into one chunk of its stream.
+FORECAST_HISTORY_DAYS = int(os.getenv('FORECAST_HISTORY_DAYS', 30))
+FORECAST_HISTORY_MAX_DAYS = int(os.getenv('FORECAST_HISTORY_MAX_DAYS', 366))
+FORECAST_HISTORY_CHUNK_SIZE = int(
+    os.getenv('FORECAST_HISTORY_CHUNK_SIZE', 2000)
+)
+
 # JWT.
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=15),
@@ -200,6 +221,10 @@ EMAIL_PORT = 587
 EMAIL_USE_TLS = True
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
+# Number of mails sent over one SMTP connection.
+MAIL_BATCH_SIZE = int(os.getenv('MAIL_BATCH_SIZE', 100))
+# Number of subscribers handled by one mailing subtask.
+MAIL_SHARD_SIZE = int(os.getenv('MAIL_SHARD_SIZE', 1000))
 
 # Celery, Redis.
 REDIS_HOST = os.getenv('REDIS_HOST')
@@ -211,3 +236,93 @@ CELERY_RESULT_BACKEND = f'redis://{REDIS_HOST}:{REDIS_PORT}/0'
 CELERY_ACCEPT_CONTENT = 'application/json',
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
+
+# Cache of the locations endpoints, in-memory if Redis isn't configured.
+if REDIS_HOST:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': f'redis://{REDIS_HOST}:{REDIS_PORT}/1',
+        }
+    }
+# Number of seconds for which a locations response is cached.
+LOCATIONS_CACHE_TIMEOUT = int(os.getenv('LOCATIONS_CACHE_TIMEOUT', 3600))
+
+# Weather filling.
+# Number of concurrent requests to the OpenWeatherMap API.
+WEATHER_FILL_CONCURRENCY = int(os.getenv('WEATHER_FILL_CONCURRENCY', 10))
+# Number of forecasts written by one bulk insert.
+WEATHER_FILL_BATCH_SIZE = int(os.getenv('WEATHER_FILL_BATCH_SIZE', 500))
+# Size in degrees of the grid cells whose cities share one API request.
+# Every city is requested separately if not set.
+WEATHER_FILL_GRID_PRECISION = (
+    float(os.getenv('WEATHER_FILL_GRID_PRECISION', 0)) or None
+)
+# Cities whose latest observation is younger than this number of minutes
+# are not requested by the hourly fill. Every city is requested if not set.
+WEATHER_FILL_FRESH_TTL_MINUTES = int(
+    os.getenv('WEATHER_FILL_FRESH_TTL_MINUTES', 0)
+)
+# Number of cities between two checkpoints of fill_weather_all_cities,
+# and the file keeping the last one, outside of the source tree.
+WEATHER_FILL_CHECKPOINT_EVERY = int(
+    os.getenv('WEATHER_FILL_CHECKPOINT_EVERY', 1000)
+)
+WEATHER_FILL_CHECKPOINT_PATH = os.getenv(
+    'WEATHER_FILL_CHECKPOINT_PATH',
+    os.path.join(tempfile.gettempdir(), 'fill_weather_checkpoint')
+)
+# Number of cities refreshed by one hourly fill subtask.
+WEATHER_FILL_TASK_BATCH_SIZE = int(
+    os.getenv('WEATHER_FILL_TASK_BATCH_SIZE', 200)
+)
+
+# Cities import.
+# Number of cities written by one upsert.
+CITIES_IMPORT_CHUNK_SIZE = int(os.getenv('CITIES_IMPORT_CHUNK_SIZE', 2000))
+# Number of processed cities between two progress reports.
+CITIES_IMPORT_PROGRESS_EVERY = int(
+    os.getenv('CITIES_IMPORT_PROGRESS_EVERY', 10000)
+)
+
+# Forecasts retention.
+# Number of full days for which the hourly forecasts are kept.
+FORECAST_RETENTION_DAYS = int(os.getenv('FORECAST_RETENTION_DAYS', 30))
+# Number of expired forecasts deleted by one statement.
+FORECAST_RETENTION_CHUNK_SIZE = int(
+    os.getenv('FORECAST_RETENTION_CHUNK_SIZE', 5000)
+)
+
+# Monthly partitions of the current weather forecasts, if the table
+# is partitioned by partition_forecasts --convert.
+# Number of months after the current one whose partitions are created.
+FORECAST_PARTITIONS_AHEAD = int(os.getenv('FORECAST_PARTITIONS_AHEAD', 2))
+
+# Delete commands.
+# Number of primary keys in the range deleted by one statement.
+DELETE_CHUNK_SIZE = int(os.getenv('DELETE_CHUNK_SIZE', 10000))
+
+# Forecasts export.
+# Number of forecasts fetched from the server-side cursor at once.
+FORECAST_EXPORT_CHUNK_SIZE = int(
+    os.getenv('FORECAST_EXPORT_CHUNK_SIZE', 10000)
+)
+# Maximum number of forecasts written to one file.
+FORECAST_EXPORT_ROWS_PER_FILE = int(
+    os.getenv('FORECAST_EXPORT_ROWS_PER_FILE', 1000000)
+)
+
+# OpenWeatherMap HTTP session, shared by all parsers of a process.
+OPENWEATHERMAP_POOL_SIZE = int(
+    os.getenv('OPENWEATHERMAP_POOL_SIZE', WEATHER_FILL_CONCURRENCY)
+)
+OPENWEATHERMAP_CONNECT_TIMEOUT = float(
+    os.getenv('OPENWEATHERMAP_CONNECT_TIMEOUT', 3.05)
+)
+OPENWEATHERMAP_READ_TIMEOUT = float(
+    os.getenv('OPENWEATHERMAP_READ_TIMEOUT', 10)
+)
+OPENWEATHERMAP_MAX_RETRIES = int(os.getenv('OPENWEATHERMAP_MAX_RETRIES', 3))
+OPENWEATHERMAP_RETRY_BACKOFF = float(
+    os.getenv('OPENWEATHERMAP_RETRY_BACKOFF', 0.5)
+)
@@ -0,0 +1,12 @@
+"""
+Benchmarks of the project. Every module is runnable with
+python -m benchmarks.<module> from the project root.
+"""
+import os
+
+import django
+
+os.environ.setdefault(
+    'DJANGO_SETTINGS_MODULE', 'DjangoWeatherReminder.settings'
+)
+django.setup()
@@ -0,0 +1,88 @@
+"""
+Compares the latency of the autocomplete city search through the
+name prefix index with the former case-insensitive LIKE filter,
+on a seeded country with 30k cities.
+
+Usage: python -m benchmarks.bench_city_search [queries_count]
+"""
+import random
+import sys
+import time
+
+from benchmarks import support
+from django_weather_reminder.models import City
+
+SYLLABLES = (
+    'ky', 'iv', 'lv', 'od', 'esa', 'khar', 'kiv', 'dni', 'pro', 'zap',
+    'or', 'izh', 'bila', 'tser', 'kva', 'ter', 'no', 'pil', 'uzh', 'gor',
+    'ma', 'ri', 'upol', 'cher', 'ni', 'hiv', 'sum', 'y', 'pol', 'ta'
+)
+
+
+def build_city_name() -> str:
+    words = (
+        ''.join(random.choices(SYLLABLES, k=random.randint(2, 4)))
+        for _ in range(random.choice((1, 1, 1, 2)))
+    )
+
+    return ' '.join(word.capitalize() for word in words)
+
+
+def seed_named_cities(cities_count: int) -> list[City]:
+    cities = support.seed_cities(1, cities_count)
+
+    for city in cities:
+        city.name = build_city_name()
+
+    City.cities.bulk_update(cities, ['name'], batch_size=5000)
+    support.analyze()
+
+    return cities
+
+
+def measure_per_query(build_queryset, queries: list[str]) -> float:
+    started = time.perf_counter()
+
+    for query in queries:
+        list(build_queryset(query))
+
+    return (time.perf_counter() - started) / len(queries)
+
+
+def main(queries_count: int) -> None:
+    with support.test_database():
+        with support.timer('Seeding'):
+            cities = seed_named_cities(30000)
+
+        country = cities[0].country_id
+        queries_by_length = {
+            f'{length} letters': [
+                random.choice(cities).name[:length]
+                for _ in range(queries_count)
+            ]
+            for length in (2, 3, 4, 6)
+        }
+        queries_by_length['No match'] = ['qqz'] * queries_count
+
+        print(f'Cities: {len(cities)}, queries: {queries_count} per length')
+
+        for label, queries in queries_by_length.items():
+            like_filter = measure_per_query(
+                lambda query: City.cities.country_cities(country).filter(
+                    name__icontains=query
+                )[:10],
+                queries
+            )
+            prefix_index = measure_per_query(
+                lambda query: City.cities.search(country, query, 10),
+                queries
+            )
+
+            print(
+                f'  {label}: LIKE filter {like_filter * 1000:.3f} ms, '
+                f'prefix index {prefix_index * 1000:.3f} ms'
+            )
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,64 @@
+"""
+Measures the throughput, the size of the files and the peak Python
+memory of the forecasts export in every available format, on seeded
+current weather forecasts.
+
+Usage: python -m benchmarks.bench_export_forecasts [hours]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from django.conf import settings
+
+from benchmarks import support
+from django_weather_reminder.models import CurrentWeather
+from django_weather_reminder.weather_db.exporters import (
+    EXPORT_FORMATS, ForecastsExporter
+)
+
+CITIES_COUNT = 1000
+
+
+def main(hours: int) -> None:
+    with support.test_database():
+        with support.timer('Seeding'):
+            cities = support.seed_cities(1, CITIES_COUNT)
+            support.seed_forecasts(cities, hours)
+            support.analyze()
+
+        forecasts = CurrentWeather.forecasts.order_by('date_time', 'pk')
+
+        for export_format in EXPORT_FORMATS:
+            with tempfile.TemporaryDirectory() as directory:
+                exporter = ForecastsExporter(
+                    directory, export_format,
+                    settings.FORECAST_EXPORT_ROWS_PER_FILE,
+                    settings.FORECAST_EXPORT_CHUNK_SIZE
+                )
+
+                started = time.perf_counter()
+                result = exporter.export(forecasts)
+                elapsed = time.perf_counter() - started
+
+                size = sum(os.path.getsize(path) for path in result.paths)
+
+                # Traced separately, as tracing slows the export down.
+                tracemalloc.start()
+                exporter.export(forecasts)
+                peak_memory = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+            print(
+                f'{export_format}: {result.rows_count / elapsed:.0f} rows/s, '
+                f'{len(result.paths)} files of {size / 2 ** 20:.1f} MiB, '
+                f'peak memory {peak_memory / 2 ** 20:.1f} MiB'
+            )
+
+    print(f'Forecasts: {CITIES_COUNT} cities x {hours} hours')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,53 @@
+"""
+Measures a first import and a full re-import of generated CSV
+locations files through the import_locations command.
+
+Usage: python -m benchmarks.bench_import_locations [cities_count]
+"""
+import os
+import random
+import sys
+import tempfile
+from contextlib import redirect_stdout
+
+from django.core.management import call_command
+
+from benchmarks import support
+
+FILES_COUNT = 4
+
+
+def write_locations_files(directory: str, cities_count: int) -> list[str]:
+    paths = []
+
+    for i in range(FILES_COUNT):
+        path = os.path.join(directory, f'locations_{i}.csv')
+
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write('name,lat,lon,country_code\n')
+
+            for j in range(cities_count // FILES_COUNT):
+                file.write(
+                    f'City {i}-{j},{random.uniform(-90, 90):.5f},'
+                    f'{random.uniform(-180, 180):.5f},C{i}\n'
+                )
+
+        paths.append(path)
+
+    return paths
+
+
+def main(cities_count: int) -> None:
+    with tempfile.TemporaryDirectory() as directory, \
+            support.test_database():
+        paths = write_locations_files(directory, cities_count)
+
+        for label in 'First import', 'Re-import':
+            with support.timer(label), redirect_stdout(None):
+                call_command('import_locations', *paths, workers=FILES_COUNT)
+
+    print(f'Cities: {cities_count} in {FILES_COUNT} files')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
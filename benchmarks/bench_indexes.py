@@ -0,0 +1,91 @@
+"""
+Shows the query plans of the hot query shapes on a seeded dataset
+without and with the indexes declared in the models Meta.
+
+Usage: python -m benchmarks.bench_indexes
+"""
+import random
+
+from django.db import connection, models as db_models
+
+from benchmarks import support
+from django_weather_reminder.models import (
+    City, CurrentWeather, Subscription, User
+)
+
+INDEXED_MODELS = City, CurrentWeather, Subscription
+
+
+def build_hot_queries() -> dict[str, db_models.QuerySet]:
+    city = random.choice(list(City.cities.active_cities()[:100]))
+    user = User.users.order_by('?').first()
+
+    return {
+        'Latest forecast of a city': CurrentWeather.forecasts.filter(
+            city=city
+        ).order_by('-date_time')[:1],
+        'Active cities of a country': City.cities.filter(
+            country=city.country_id, active=True
+        ),
+        'Active cities': City.cities.active_cities(),
+        'Subscriptions by frequency': Subscription.subscriptions.filter(
+            frequency=24
+        ),
+        'Subscription of a user to a city': Subscription.subscriptions.filter(
+            user=user, city=city
+        ),
+    }
+
+
+def set_indexes(enabled: bool) -> None:
+    with connection.schema_editor() as editor:
+        for model in INDEXED_MODELS:
+            for index in model._meta.indexes:
+                if enabled:
+                    editor.add_index(model, index)
+                else:
+                    editor.remove_index(model, index)
+
+            for constraint in model._meta.constraints:
+                if enabled:
+                    editor.add_constraint(model, constraint)
+                else:
+                    editor.remove_constraint(model, constraint)
+
+    support.analyze()
+
+
+def print_plans(hot_queries: dict[str, db_models.QuerySet]) -> None:
+    for name, queryset in hot_queries.items():
+        plan = queryset.explain(analyze=True).splitlines()
+        scan = next(line for line in plan if 'Scan' in line)
+        execution_time = next(
+            line for line in plan if line.startswith('Execution Time')
+        )
+
+        print(f'  {name}:')
+        print(f'    {scan.strip(" ->")}')
+        print(f'    {execution_time}')
+
+
+def main() -> None:
+    with support.test_database():
+        with support.timer('Seeding'):
+            cities = support.seed_cities(3, 10000)
+            active_cities = [city for city in cities if city.active]
+            support.seed_forecasts(active_cities, 48)
+            support.seed_subscriptions(active_cities, 5000, 3)
+
+        hot_queries = build_hot_queries()
+
+        set_indexes(False)
+        print('Without indexes:')
+        print_plans(hot_queries)
+
+        set_indexes(True)
+        print('With indexes:')
+        print_plans(hot_queries)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""
+Measures the build time of the nearest cities index and the time
+of a lookup through the k-d tree alone and with the cities query,
+on 30k seeded cities.
+
+Usage: python -m benchmarks.bench_nearest_cities [lookups_count]
+"""
+import random
+import sys
+import time
+
+from benchmarks import support
+from django_weather_reminder.api.nearest import NearestCitiesIndex
+from django_weather_reminder.weather_db.support import geo
+
+
+def main(lookups_count: int) -> None:
+    with support.test_database():
+        with support.timer('Seeding'):
+            support.seed_cities(3, 10000)
+
+        index = NearestCitiesIndex()
+
+        with support.timer('Index build'):
+            tree = index._build_tree()
+
+        points = [
+            (random.uniform(44, 52), random.uniform(22, 40))
+            for _ in range(lookups_count)
+        ]
+
+        started = time.perf_counter()
+
+        for lat, lon in points:
+            tree.nearest(geo.to_unit_vector(lat, lon), 10)
+
+        tree_lookup = (time.perf_counter() - started) / lookups_count
+
+        index.find(*points[0], 10)
+        started = time.perf_counter()
+
+        for lat, lon in points:
+            index.find(lat, lon, 10)
+
+        find = (time.perf_counter() - started) / lookups_count
+
+    print(f'Cities: {len(tree)}, lookups: {lookups_count}, k: 10')
+    print(f'  k-d tree lookup:        {tree_lookup * 1000:.3f} ms')
+    print(f'  Lookup with the cities: {find * 1000:.3f} ms')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,55 @@
+"""
+Compares the time spent per city by the OpenWeatherMap parser with
+a pooled keep-alive session and with a new connection per request.
+
+Usage: python -m benchmarks.bench_parser_session [cities_count]
+"""
+import sys
+import time
+
+from django_weather_reminder.openweathermap.parser import (
+    OpenWeatherMapParser, build_session
+)
+from django_weather_reminder.tests.stub_server import (
+    ConnectionPerRequestParser, OpenWeatherMapStubServer
+)
+
+
+def measure_per_city(parser, cities_count: int) -> float:
+    started = time.perf_counter()
+
+    for i in range(cities_count):
+        parser.parse_city_current_weather(i, i)
+
+    return (time.perf_counter() - started) / cities_count
+
+
+def main(cities_count: int) -> None:
+    with OpenWeatherMapStubServer() as server:
+        parser = OpenWeatherMapParser(
+            'bench_key', session=build_session(1, 0, 0),
+            base_url=server.base_url
+        )
+
+        pooled = measure_per_city(parser, cities_count)
+        pooled_connections = server.connections_count
+
+        unpooled = measure_per_city(
+            ConnectionPerRequestParser(parser), cities_count
+        )
+        unpooled_connections = server.connections_count - pooled_connections
+
+    print(f'Cities: {cities_count}')
+    print(
+        f'Pooled session:         {pooled * 1000:.3f} ms/city, '
+        f'{pooled_connections} connections'
+    )
+    print(
+        f'Connection per request: {unpooled * 1000:.3f} ms/city, '
+        f'{unpooled_connections} connections'
+    )
+    print(f'Saved per city:         {(unpooled - pooled) * 1000:.3f} ms')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
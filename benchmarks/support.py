@@ -0,0 +1,110 @@
+import random
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Iterator
+
+from django.db import connection
+
+from django_weather_reminder import models
+
+
+@contextmanager
+def test_database() -> Iterator[None]:
+    """
+    Creates a throwaway test database with the project migrations applied
+    and destroys it on exit, so benchmarks never touch the real data.
+    """
+
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0)
+
+    try:
+        yield None
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+@contextmanager
+def timer(label: str) -> Iterator[None]:
+    started = time.perf_counter()
+
+    yield None
+
+    print(f'{label}: {time.perf_counter() - started:.3f} s')
+
+
+def seed_cities(
+        countries_count: int, cities_per_country: int,
+        active_share: float = 0.1
+) -> list[models.City]:
+    countries = models.Country.countries.bulk_create(
+        models.Country(name=f'Country {i}', code=f'{i:02d}')
+        for i in range(countries_count)
+    )
+
+    cities = [
+        models.City(
+            name=f'City {country.pk}-{i}',
+            lat=random.uniform(-90, 90), lon=random.uniform(-180, 180),
+            active=random.random() < active_share, country=country
+        )
+        for country in countries for i in range(cities_per_country)
+    ]
+
+    return models.City.cities.bulk_create(cities, batch_size=5000)
+
+
+def seed_forecasts(cities: list[models.City], hours: int) -> None:
+    now = datetime.now(tz=timezone.utc).replace(
+        minute=0, second=0, microsecond=0
+    )
+
+    forecasts = (
+        models.CurrentWeather(
+            weather_status=random.choice(('Clouds', 'Clear', 'Rain')),
+            weather_description='benchmark', pressure=1012,
+            humidity=random.randint(0, 100), wind_speed=3,
+            temp=random.uniform(-10, 30), feels_like=random.uniform(-10, 30),
+            date_time=now - timedelta(hours=hour), city=city
+        )
+        for city in cities for hour in range(hours)
+    )
+
+    batch = []
+
+    for forecast in forecasts:
+        batch.append(forecast)
+
+        if len(batch) == 10000:
+            models.CurrentWeather.forecasts.bulk_create(batch)
+            batch = []
+
+    models.CurrentWeather.forecasts.bulk_create(batch)
+
+
+def seed_subscriptions(
+        cities: list[models.City], users_count: int,
+        subscriptions_per_user: int
+) -> None:
+    users = models.User.users.bulk_create(
+        models.User(username=f'user{i}', email=f'user{i}@example.com')
+        for i in range(users_count)
+    )
+
+    models.Subscription.subscriptions.bulk_create(
+        (
+            models.Subscription(
+                user=user, city=city,
+                frequency=random.choice((1, 3, 6, 12, 24))
+            )
+            for user in users
+            for city in random.sample(cities, subscriptions_per_user)
+        ),
+        batch_size=5000
+    )
+
+
+def analyze() -> None:
+    with connection.cursor() as cursor:
+        cursor.execute('VACUUM ANALYZE')
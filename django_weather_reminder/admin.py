@@ -1,7 +1,8 @@
 from django.contrib import admin
 
 from django_weather_reminder.models import (
-    Country, City, User, Subscription, CurrentWeather
+    Country, City, User, Subscription, CurrentWeather, DailyWeather,
+    HourlyForecast, DailyForecast
 )
 
 admin.site.register(Country)
@@ -9,3 +10,6 @@ admin.site.register(City)
 admin.site.register(User)
 admin.site.register(Subscription)
 admin.site.register(CurrentWeather)
+admin.site.register(DailyWeather)
+admin.site.register(HourlyForecast)
+admin.site.register(DailyForecast)
@@ -0,0 +1,165 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+LOCATIONS_VERSION_KEY = 'locations:version'
+# Changed only when cities are created, deleted or moved.
+CITIES_GEOMETRY_VERSION_KEY = 'locations:geometry_version'
+
+
+def _get_version(key: str) -> int:
+    """
+    Returns the current version stored under key. A missing version
+    starts from the current time, so it never goes back to a version
+    whose data may still be cached.
+    """
+
+    version = cache.get(key)
+
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+
+    return version
+
+
+def _bump_version(key: str) -> None:
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), None)
+
+
+def get_locations_version() -> int:
+    """Returns the current version of the cached location responses."""
+
+    return _get_version(LOCATIONS_VERSION_KEY)
+
+
+def invalidate_locations() -> None:
+    """Makes every cached location response stale."""
+
+    _bump_version(LOCATIONS_VERSION_KEY)
+
+
+def get_cities_geometry_version() -> int:
+    """Returns the current version of the cities coordinates."""
+
+    return _get_version(CITIES_GEOMETRY_VERSION_KEY)
+
+
+def invalidate_cities_geometry() -> None:
+    """Makes every index of the cities coordinates stale."""
+
+    _bump_version(CITIES_GEOMETRY_VERSION_KEY)
+
+
+class LocationsCacheMixin:
+    """
+    Caches the successful list and retrieve responses of a viewset
+    under the current locations version.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self._get_cached_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    @staticmethod
+    def _get_cached_response(view, request, *args, **kwargs) -> Response:
+        # The path only: the links of paginated responses are built
+        # from API_BASE_URL, not from the Host header.
+        key = f'locations:{request.get_full_path()}'
+        version = get_locations_version()
+
+        if (data := cache.get(key, version=version)) is not None:
+            return Response(data)
+
+        response = view(request, *args, **kwargs)
+
+        if response.status_code == 200:
+            cache.set(
+                key, response.data, settings.LOCATIONS_CACHE_TIMEOUT,
+                version=version
+            )
+
+        return response
+
+
+class LocationsConditionalMixin:
+    """
+    Adds ETag and Last-Modified headers to the list and retrieve
+    responses of a viewset and answers matching conditional requests
+    with 304 before any serialization. The validators are built from
+    the change marker returned by get_change_marker, which every
+    viewset using the mixin must define. The marker is cached under
+    the current locations version, so warm requests don't query it.
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        base_marker = LocationsConditionalMixin.get_change_marker
+
+        if cls.get_change_marker is base_marker:
+            raise TypeError(f'{cls.__name__} must define get_change_marker.')
+
+    def get_change_marker(self) -> dict:
+        """Returns the last_modified and count of the returned rows."""
+
+    def list(self, request, *args, **kwargs):
+        return self._get_conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._get_conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def _get_cached_change_marker(self, request) -> dict:
+        # The marker depends on the action and the URL kwargs only.
+        key = f'locations:marker:{request.path}'
+        version = get_locations_version()
+
+        if (marker := cache.get(key, version=version)) is None:
+            marker = self.get_change_marker()
+            cache.set(
+                key, marker, settings.LOCATIONS_CACHE_TIMEOUT,
+                version=version
+            )
+
+        return marker
+
+    def _get_conditional_response(self, view, request, *args, **kwargs):
+        marker = self._get_cached_change_marker(request)
+
+        if (last_modified := marker['last_modified']) is None:
+            return view(request, *args, **kwargs)
+
+        etag = quote_etag(
+            f'{marker["count"]}-{last_modified.timestamp():.6f}'
+        )
+        timestamp = int(last_modified.timestamp())
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=timestamp
+        )
+
+        if response is None:
+            response = view(request, *args, **kwargs)
+
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(timestamp)
+
+        return response
@@ -0,0 +1,31 @@
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+
+
+class CityNameSearchFilter(BaseFilterBackend):
+    """
+    Filters the cities by the parts of their name given as the words
+    of the search query parameter.
+    """
+
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        if not (query := request.query_params.get(self.search_param)):
+            return queryset
+
+        return queryset.name_search(query)
+
+
+class StableOrderingFilter(OrderingFilter):
+    """
+    Orders by the requested fields, then by primary key, so rows with
+    equal values keep the same order from one page to the next.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+
+        if ordering and not {'pk', '-pk'} & set(ordering):
+            ordering = [*ordering, 'pk']
+
+        return ordering
@@ -0,0 +1,70 @@
+import math
+import threading
+
+from django_weather_reminder.api.cache import get_cities_geometry_version
+from django_weather_reminder.models import City
+from django_weather_reminder.weather_db.support import geo
+from django_weather_reminder.weather_db.support.kdtree import KDTree
+
+
+class NearestCitiesIndex:
+    """
+    In-memory k-d tree of the cities locations of a process.
+    It is built on the first lookup and rebuilt on the first lookup
+    after the cities geometry version has changed, so only creating,
+    deleting or moving cities rebuilds it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version: int | None = None
+        self._tree: KDTree | None = None
+
+    def _build_tree(self) -> KDTree:
+        cities = City.cities.values_list('pk', 'lat', 'lon')
+
+        points, ids = [], []
+
+        for city_id, lat, lon in cities.iterator(chunk_size=5000):
+            points.append(geo.to_unit_vector(lat, lon))
+            ids.append(city_id)
+
+        return KDTree(points, ids)
+
+    def _get_tree(self) -> KDTree:
+        version = get_cities_geometry_version()
+
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._tree = self._build_tree()
+                    self._version = version
+
+        return self._tree
+
+    def find(self, lat: float, lon: float, k: int) -> list[City]:
+        """
+        Returns the k cities nearest to the given point, the nearest
+        first, with their distance in kilometers.
+        """
+
+        neighbours = self._get_tree().nearest(geo.to_unit_vector(lat, lon), k)
+
+        cities = City.cities.select_related('country').in_bulk(
+            [city_id for _, city_id in neighbours]
+        )
+
+        nearest_cities = []
+
+        for distance, city_id in neighbours:
+            # Deleted after the tree was built.
+            if (city := cities.get(city_id)) is None:
+                continue
+
+            city.distance = geo.chord_to_km(math.sqrt(distance))
+            nearest_cities.append(city)
+
+        return nearest_cities
+
+
+nearest_cities_index = NearestCitiesIndex()
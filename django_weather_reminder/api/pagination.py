@@ -0,0 +1,75 @@
+from urllib.parse import urlsplit, urlunsplit
+
+from django.conf import settings
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+from rest_framework.settings import api_settings
+
+
+def rebase_link(link: str | None) -> str | None:
+    """
+    Moves a page link to the scheme and host of API_BASE_URL, so links
+    never depend on the Host header of the request which built them.
+    """
+
+    if link is None or not settings.API_BASE_URL:
+        return link
+
+    base_url = urlsplit(settings.API_BASE_URL)
+
+    return urlunsplit(
+        urlsplit(link)._replace(scheme=base_url.scheme, netloc=base_url.netloc)
+    )
+
+
+class RebasedLinksMixin:
+    def get_next_link(self):
+        return rebase_link(super().get_next_link())
+
+    def get_previous_link(self):
+        return rebase_link(super().get_previous_link())
+
+
+class PkCursorPagination(RebasedLinksMixin, CursorPagination):
+    """
+    Pages through a list by the last seen primary key, so every page
+    costs one indexed query whatever its depth.
+    """
+
+    ordering = 'pk'
+
+    page_size = settings.API_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = settings.API_MAX_PAGE_SIZE
+
+
+class OffsetPagination(RebasedLinksMixin, LimitOffsetPagination):
+    default_limit = settings.API_PAGE_SIZE
+    max_limit = settings.API_MAX_PAGE_SIZE
+
+
+class OrderedListPagination(PkCursorPagination):
+    """
+    Pages through a list by primary key, unless the client orders it by
+    another field. A cursor on a field with repeated values relies on
+    offsets among the equal values and skips or repeats rows when the
+    list changes between pages, so such lists are paginated by limit
+    and offset instead.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.offset_paginator = None
+
+        if request.query_params.get(api_settings.ORDERING_PARAM):
+            self.offset_paginator = OffsetPagination()
+
+            return self.offset_paginator.paginate_queryset(
+                queryset, request, view
+            )
+
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.offset_paginator is not None:
+            return self.offset_paginator.get_paginated_response(data)
+
+        return super().get_paginated_response(data)
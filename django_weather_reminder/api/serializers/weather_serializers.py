@@ -1,14 +1,19 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
 from rest_framework import serializers
 
 from django_weather_reminder.models import (
-    City, Country, CurrentWeather, Subscription
+    City, Country, CurrentWeather, DailyForecast, HourlyForecast, Subscription
 )
 
 
 class CountrySerializer(serializers.ModelSerializer):
     class Meta:
         model = Country
-        fields = '__all__'
+        exclude = 'updated_at',
 
 
 class CitySerializer(serializers.ModelSerializer):
@@ -16,7 +21,20 @@ class CitySerializer(serializers.ModelSerializer):
 
     class Meta:
         model = City
-        fields = '__all__'
+        exclude = 'latest_forecast', 'updated_at'
+
+
+class NearestCitySerializer(CitySerializer):
+    distance = serializers.FloatField(read_only=True)
+
+
+class NearestCitiesQuerySerializer(serializers.Serializer):
+    lat = serializers.FloatField(min_value=-90, max_value=90)
+    lon = serializers.FloatField(min_value=-180, max_value=180)
+    k = serializers.IntegerField(
+        min_value=1, max_value=settings.NEAREST_CITIES_MAX_LIMIT,
+        default=settings.NEAREST_CITIES_LIMIT
+    )
 
 
 class NameRelatedField(serializers.RelatedField):
@@ -35,6 +53,53 @@ class CurrentWeatherSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+class ForecastHistoryQuerySerializer(serializers.Serializer):
+    """
+    Validates the from and to query parameters of the forecast history,
+    by default the last FORECAST_HISTORY_DAYS days. The range can't be
+    longer than FORECAST_HISTORY_MAX_DAYS days.
+    """
+
+    # "from" is a keyword, so the field is renamed in get_fields.
+    from_ = serializers.DateTimeField(required=False)
+    to = serializers.DateTimeField(required=False)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fields['from'] = fields.pop('from_')
+
+        return fields
+
+    def validate(self, attrs):
+        until = attrs.setdefault('to', timezone.now())
+        since = attrs.setdefault(
+            'from', until - timedelta(days=settings.FORECAST_HISTORY_DAYS)
+        )
+
+        if since >= until:
+            raise serializers.ValidationError('from must be before to.')
+
+        if until - since > timedelta(days=settings.FORECAST_HISTORY_MAX_DAYS):
+            raise serializers.ValidationError(
+                'The range must not be longer than '
+                f'{settings.FORECAST_HISTORY_MAX_DAYS} days.'
+            )
+
+        return attrs
+
+
+class HourlyForecastSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = HourlyForecast
+        exclude = 'id', 'city'
+
+
+class DailyForecastSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DailyForecast
+        exclude = 'id', 'city'
+
+
 class SubscriptionSerializer(serializers.ModelSerializer):
     user = serializers.StringRelatedField(read_only=True)
 
@@ -50,18 +115,30 @@ class SubscriptionSerializer(serializers.ModelSerializer):
 
         user = self.context['request'].user
 
-        if user.city_subscriptions.filter(pk=city.pk).exists():
+        try:
+            with transaction.atomic():
+                subscription = Subscription.subscriptions.create(
+                    user=user, city=city, frequency=frequency
+                )
+        except IntegrityError:
             raise serializers.ValidationError(
                 'You can only subscribe to one city once!'
             )
 
         if not city.active:
             city.active = True
-            city.save()
+            city.save(update_fields=('active', 'updated_at'))
 
-        return Subscription.subscriptions.create(
-            user=user, city=city, frequency=frequency
-        )
+        return subscription
+
+    def update(self, instance, validated_data):
+        try:
+            with transaction.atomic():
+                return super().update(instance, validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError(
+                'You can only subscribe to one city once!'
+            )
 
     class Meta:
         model = Subscription
@@ -0,0 +1,55 @@
+import json
+from itertools import islice
+from typing import Iterable, Iterator
+
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Renders newline delimited JSON, one value per line. Streamed
+    responses write their rows themselves, so this renderer only
+    renders the other responses, such as errors, as one line.
+    """
+
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        return (json.dumps(data, cls=JSONEncoder) + '\n').encode()
+
+
+def iter_json_chunks(
+        rows: Iterable[dict], chunk_size: int, ndjson: bool = False
+) -> Iterator[str]:
+    """
+    Serializes rows as a JSON array, or as NDJSON lines, yielding
+    one string per chunk of chunk_size rows, so only one chunk
+    is held in memory whatever the number of rows.
+    """
+
+    rows = iter(rows)
+    encoder = JSONEncoder()
+    separator = '\n' if ndjson else ','
+    started = False
+
+    if not ndjson:
+        yield '['
+
+    while chunk := list(islice(rows, chunk_size)):
+        body = separator.join(map(encoder.encode, chunk))
+
+        if ndjson:
+            yield body + '\n'
+        else:
+            yield f',{body}' if started else body
+
+        started = True
+
+    if not ndjson:
+        yield ']'
@@ -1,12 +1,24 @@
+import json
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from rest_framework import viewsets
 from rest_framework.test import APITestCase
+from django.core.cache import cache
+from django.test import override_settings
 from django.urls import reverse_lazy
 
+from django_weather_reminder.api.cache import LocationsConditionalMixin
+from django_weather_reminder.api.nearest import nearest_cities_index
+from django_weather_reminder.api.pagination import PkCursorPagination
 from django_weather_reminder.tests import factories
 from django_weather_reminder.models import City, Country, Subscription
 
 
 class TestCountryViewSet(APITestCase):
     def setUp(self) -> None:
+        self.addCleanup(cache.clear)
+
         self.test_country = factories.CountryFactory()
         self.country_list_url = reverse_lazy('country-list')
 
@@ -65,6 +77,29 @@ class TestCountryViewSet(APITestCase):
         self.assertEqual(response.status_code, 200)
         self.assertJSONEqual(response.content, expected_json)
 
+    def test_not_modified_country_detail(self) -> None:
+        country_detail_url = reverse_lazy(
+            'country-detail', args=(self.test_country.pk,)
+        )
+        etag = self.client.get(country_detail_url)['ETag']
+
+        response = self.client.get(
+            country_detail_url, HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(response.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.test_country.name = '_renamed'
+            self.test_country.save()
+
+        response = self.client.get(
+            country_detail_url, HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['name'], '_renamed')
+
     def test_get_non_existent_country_detail(self) -> None:
         expected_json = {'detail': 'Not found.'}
 
@@ -88,6 +123,8 @@ class TestCityViewSet(APITestCase):
         return test_cities
 
     def setUp(self) -> None:
+        self.addCleanup(cache.clear)
+
         self.test_country = factories.CountryFactory()
         self.test_cities = self._create_test_cities(self.test_country)
         self.test_city = self.test_cities[0]
@@ -126,7 +163,7 @@ class TestCityViewSet(APITestCase):
         )
 
         self.assertEqual(response.status_code, 200)
-        self.assertJSONEqual(response.content, expected_json)
+        self.assertEqual(response.json()['results'], expected_json)
 
     def test_get_active_cities(self) -> None:
         active_cities = self.test_cities[:2]
@@ -138,7 +175,7 @@ class TestCityViewSet(APITestCase):
         )
 
         self.assertEqual(response.status_code, 200)
-        self.assertJSONEqual(response.content, expected_json)
+        self.assertEqual(response.json()['results'], expected_json)
 
     def test_city_search(self) -> None:
         matched_cities = [
@@ -153,7 +190,106 @@ class TestCityViewSet(APITestCase):
         )
 
         self.assertEqual(response.status_code, 200)
-        self.assertJSONEqual(response.content, expected_json)
+        self.assertEqual(response.json()['results'], expected_json)
+
+    def test_city_search_by_words_prefixes(self) -> None:
+        matched_city = factories.CityFactory(
+            name='Bila Tserkva', country=self.test_country
+        )
+        factories.CityFactory(name='Bilyky', country=self.test_country)
+
+        response = self.client.get(
+            f'{self.city_list_url}?search=tserk%20bil'
+        )
+
+        self.assertEqual(
+            response.json()['results'],
+            self._build_expected_json_list([matched_city])
+        )
+
+    def test_search_cities(self) -> None:
+        matched_cities = [
+            factories.CityFactory(name='Kyiv', country=self.test_country),
+            factories.CityFactory(
+                name='Kyivska Oblast', country=self.test_country
+            ),
+            factories.CityFactory(name='Kyinka', country=self.test_country)
+        ]
+        factories.CityFactory(name='Kyiv', country=factories.CountryFactory())
+
+        response = self.client.get(
+            reverse_lazy('city-search', args=(self.test_country.pk,)),
+            {'q': 'kyi', 'limit': 2}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            self._build_expected_json_list(
+                [matched_cities[2], matched_cities[0]]
+            )
+        )
+
+    def test_search_cities_by_name_part(self) -> None:
+        matched_city = factories.CityFactory(
+            name='Bila Tserkva', country=self.test_country
+        )
+
+        for url, query in (
+            (reverse_lazy('city-search', args=(self.test_country.pk,)),
+             {'q': 'erkv'}),
+            (self.city_list_url, {'search': 'erkv'})
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url, query)
+                found_cities = response.json()
+
+                if 'results' in found_cities:
+                    found_cities = found_cities['results']
+
+                self.assertEqual(
+                    [city['id'] for city in found_cities], [matched_city.pk]
+                )
+
+    def test_search_cities_with_wrong_limit(self) -> None:
+        response = self.client.get(
+            reverse_lazy('city-search', args=(self.test_country.pk,)),
+            {'q': 'kyi', 'limit': 0}
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_paginate_cities_list(self) -> None:
+        expected_json = self._build_expected_json_list(self.test_cities)
+
+        first_page = self.client.get(f'{self.city_list_url}?page_size=2')
+        second_page = self.client.get(first_page.json()['next'])
+
+        self.assertEqual(first_page.json()['results'], expected_json[:2])
+        self.assertIsNone(first_page.json()['previous'])
+        self.assertEqual(second_page.json()['results'], expected_json[2:])
+        self.assertIsNone(second_page.json()['next'])
+
+    @override_settings(API_BASE_URL='https://api.example.com')
+    def test_cities_links_ignore_host_header(self) -> None:
+        url = f'{self.city_list_url}?page_size=2'
+
+        for host in 'evil.example.com', 'testserver':
+            with self.subTest(host=host):
+                response = self.client.get(url, HTTP_HOST=host)
+
+                self.assertTrue(
+                    response.json()['next'].startswith(
+                        f'https://api.example.com{self.city_list_url}'
+                    )
+                )
+
+    @mock.patch.object(PkCursorPagination, 'max_page_size', 2)
+    def test_cities_page_size_limit(self) -> None:
+        response = self.client.get(f'{self.city_list_url}?page_size=100')
+
+        self.assertEqual(len(response.json()['results']), 2)
+        self.assertIsNotNone(response.json()['next'])
 
     def test_get_detail_city(self) -> None:
         expected_json = self._build_expected_json_detail(self.test_city)
@@ -189,6 +325,359 @@ class TestCityViewSet(APITestCase):
         self.assertEqual(response.status_code, 404)
         self.assertJSONEqual(response.content, expected_json)
 
+    def test_cached_cities_list(self) -> None:
+        self.client.get(self.city_list_url)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.city_list_url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            len(response.json()['results']), len(self.test_cities)
+        )
+
+    def test_cities_list_invalidated_by_city_save(self) -> None:
+        self.client.get(self.city_list_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.test_city.name = '_renamed'
+            self.test_city.save()
+
+        response = self.client.get(self.city_list_url)
+
+        self.assertEqual(response.json()['results'][0]['name'], '_renamed')
+
+    def test_cities_list_invalidated_after_commit(self) -> None:
+        self.client.get(self.city_list_url)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.test_city.name = '_renamed'
+            self.test_city.save()
+
+            response = self.client.get(self.city_list_url)
+
+        self.assertNotEqual(
+            response.json()['results'][0]['name'], '_renamed'
+        )
+
+        for callback in callbacks:
+            callback()
+
+        response = self.client.get(self.city_list_url)
+
+        self.assertEqual(response.json()['results'][0]['name'], '_renamed')
+
+    def test_not_modified_cities_list(self) -> None:
+        etag = self.client.get(self.city_list_url)['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                self.city_list_url, HTTP_IF_NONE_MATCH=etag
+            )
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertFalse(response.content)
+
+    def test_cities_list_etag_changes(self) -> None:
+        etag = self.client.get(self.city_list_url)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.test_cities[-1].delete()
+
+        response = self.client.get(
+            self.city_list_url, HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(
+            len(response.json()['results']), len(self.test_cities) - 1
+        )
+
+    def test_not_modified_city_detail(self) -> None:
+        city_detail_url = reverse_lazy(
+            'city-detail', args=(self.test_country.pk, self.test_city.pk)
+        )
+        last_modified = self.client.get(city_detail_url)['Last-Modified']
+
+        response = self.client.get(
+            city_detail_url, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_city_detail_invalidated_by_subscription(self) -> None:
+        inactive_city = self.test_cities[2]
+        city_detail_url = reverse_lazy(
+            'city-detail', args=(self.test_country.pk, inactive_city.pk)
+        )
+
+        self.client.get(city_detail_url)
+
+        self.client.force_authenticate(factories.UserFactory())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse_lazy('subscription-list'),
+                {'city': inactive_city.pk, 'frequency': 3}
+            )
+
+        response = self.client.get(city_detail_url)
+
+        self.assertTrue(response.json()['active'])
+
+    def test_cities_list_etag_changes_on_subscription(self) -> None:
+        inactive_city = self.test_cities[2]
+        etag = self.client.get(self.city_list_url)['ETag']
+
+        self.client.force_authenticate(factories.UserFactory())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse_lazy('subscription-list'),
+                {'city': inactive_city.pk, 'frequency': 3}
+            )
+
+        response = self.client.get(
+            self.city_list_url, HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertIn(
+            {'id': inactive_city.pk, 'active': True},
+            [
+                {'id': city['id'], 'active': city['active']}
+                for city in response.json()['results']
+            ]
+        )
+
+    def test_conditional_mixin_requires_change_marker(self) -> None:
+        with self.assertRaises(TypeError):
+            type(
+                'NoMarkerViewSet',
+                (LocationsConditionalMixin, viewsets.ReadOnlyModelViewSet),
+                {}
+            )
+
+
+class TestNearestCitiesView(APITestCase):
+    def setUp(self) -> None:
+        self.addCleanup(cache.clear)
+
+        self.kyiv = factories.CityFactory(name='Kyiv', lat=50.45, lon=30.52)
+        self.lviv = factories.CityFactory(name='Lviv', lat=49.84, lon=24.03)
+        self.odesa = factories.CityFactory(name='Odesa', lat=46.48, lon=30.72)
+
+        self.nearest_url = reverse_lazy('city-nearest')
+
+    def test_get_nearest_cities(self) -> None:
+        response = self.client.get(
+            self.nearest_url, {'lat': 50.4, 'lon': 30.6, 'k': 2}
+        )
+
+        received_json = response.json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [city['name'] for city in received_json], ['Kyiv', 'Odesa']
+        )
+        self.assertAlmostEqual(received_json[0]['distance'], 8, delta=1)
+
+    def test_nearest_cities_rebuilt_after_change(self) -> None:
+        self.client.get(self.nearest_url, {'lat': 49.9, 'lon': 24.1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            nearest_city = factories.CityFactory(
+                name='Vynnyky', lat=49.9, lon=24.1
+            )
+
+        response = self.client.get(
+            self.nearest_url, {'lat': 49.9, 'lon': 24.1, 'k': 1}
+        )
+
+        self.assertEqual(response.json()[0]['id'], nearest_city.pk)
+
+    def test_nearest_cities_rebuilt_after_move(self) -> None:
+        self.client.get(self.nearest_url, {'lat': 46.5, 'lon': 30.7})
+
+        self.odesa.lat, self.odesa.lon = 50.0, 36.23
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.odesa.save()
+
+        response = self.client.get(
+            self.nearest_url, {'lat': 46.5, 'lon': 30.7, 'k': 1}
+        )
+
+        self.assertEqual(response.json()[0]['id'], self.kyiv.pk)
+
+    def test_nearest_cities_not_rebuilt_after_activation(self) -> None:
+        self.client.get(self.nearest_url, {'lat': 49.9, 'lon': 24.1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lviv.active = True
+            self.lviv.save(update_fields=('active', 'updated_at'))
+            self.kyiv.name = 'Kyiv City'
+            self.kyiv.save()
+
+        with mock.patch.object(
+                nearest_cities_index, '_build_tree',
+                wraps=nearest_cities_index._build_tree
+        ) as build_tree:
+            self.client.get(self.nearest_url, {'lat': 49.9, 'lon': 24.1})
+
+        build_tree.assert_not_called()
+
+    def test_get_nearest_cities_with_wrong_point(self) -> None:
+        response = self.client.get(
+            self.nearest_url, {'lat': 91, 'lon': 30.6}
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('lat', response.json())
+
+
+class TestCityForecastView(APITestCase):
+    def setUp(self) -> None:
+        self.test_city = factories.CityFactory()
+
+        self.hourly_forecasts = [
+            factories.HourlyForecastFactory(city=self.test_city)
+            for _ in range(3)
+        ]
+        self.daily_forecasts = [
+            factories.DailyForecastFactory(city=self.test_city)
+            for _ in range(2)
+        ]
+
+    def test_get_city_forecast(self) -> None:
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                reverse_lazy(
+                    'city-forecast',
+                    args=(self.test_city.country.pk, self.test_city.pk)
+                )
+            )
+
+        received_json = response.json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [forecast['temp'] for forecast in received_json['hourly']],
+            [forecast.temp for forecast in self.hourly_forecasts]
+        )
+        self.assertEqual(
+            [forecast['temp_max'] for forecast in received_json['daily']],
+            [forecast.temp_max for forecast in self.daily_forecasts]
+        )
+
+    def test_get_city_forecast_with_wrong_country(self) -> None:
+        response = self.client.get(
+            reverse_lazy('city-forecast', args=(404, self.test_city.pk))
+        )
+
+        self.assertEqual(response.status_code, 404)
+        self.assertJSONEqual(response.content, {'detail': 'Not found.'})
+
+
+class TestCityForecastHistoryView(APITestCase):
+    def setUp(self) -> None:
+        self.test_city = factories.CityFactory()
+        self.now = datetime.now(tz=timezone.utc)
+
+        self.forecasts = [
+            factories.CurrentWeatherFactory(
+                city=self.test_city, temp=temp,
+                date_time=self.now - timedelta(days=days_ago)
+            )
+            for days_ago, temp in ((40, -5), (10, 1), (2, 3), (0.5, 4))
+        ]
+        self.other_city = factories.CityFactory(
+            country=self.test_city.country
+        )
+        factories.CurrentWeatherFactory(
+            city=self.other_city, date_time=self.now
+        )
+
+    def _get_history(self, query=None, city=None):
+        city = city or self.test_city
+
+        return self.client.get(
+            reverse_lazy(
+                'city-forecast-history', args=(city.country.pk, city.pk)
+            ),
+            query
+        )
+
+    def test_get_city_history(self) -> None:
+        with self.assertNumQueries(2):
+            response = self._get_history()
+            content = b''.join(response.streaming_content)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(
+            [forecast['temp'] for forecast in json.loads(content)], [1, 3, 4]
+        )
+
+    def test_get_city_history_range(self) -> None:
+        response = self._get_history({
+            'from': (self.now - timedelta(days=50)).isoformat(),
+            'to': (self.now - timedelta(days=1)).isoformat()
+        })
+
+        received_json = json.loads(b''.join(response.streaming_content))
+
+        self.assertEqual(
+            [forecast['temp'] for forecast in received_json], [-5, 1, 3]
+        )
+        self.assertEqual(
+            set(received_json[0]),
+            {
+                'date_time', 'temp', 'feels_like', 'pressure', 'humidity',
+                'wind_speed', 'weather_status', 'weather_description'
+            }
+        )
+
+    def test_get_empty_city_history(self) -> None:
+        self.other_city.current_forecasts.all().delete()
+
+        response = self._get_history(city=self.other_city)
+
+        self.assertEqual(b''.join(response.streaming_content), b'[]')
+
+    def test_get_city_history_as_ndjson(self) -> None:
+        response = self._get_history({'format': 'ndjson'})
+
+        lines = b''.join(response.streaming_content).decode().splitlines()
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(
+            [json.loads(line)['temp'] for line in lines], [1, 3, 4]
+        )
+
+    def test_get_city_history_with_wrong_range(self) -> None:
+        for query in (
+            {'from': self.now.isoformat(), 'to': self.now.isoformat()},
+            {'from': (self.now - timedelta(days=1000)).isoformat()},
+            {'to': 'yesterday'}
+        ):
+            with self.subTest(query=query):
+                response = self._get_history(query)
+
+                self.assertEqual(response.status_code, 400)
+
+    def test_get_city_history_with_wrong_country(self) -> None:
+        response = self.client.get(
+            reverse_lazy(
+                'city-forecast-history', args=(404, self.test_city.pk)
+            )
+        )
+
+        self.assertEqual(response.status_code, 404)
+
 
 class TestSubscriptionViewSet(APITestCase):
     def _create_user(self) -> None:
@@ -274,13 +763,27 @@ class TestSubscriptionViewSet(APITestCase):
 
     def test_get_user_subscription_list(self) -> None:
         expected_json = self._build_expected_json_list(
-            self.test_user.subscriptions.all()
+            self.test_user.subscriptions.order_by('pk')
         )
 
         response = self.client.get(self.subscription_list_url)
 
         self.assertEqual(response.status_code, 200)
-        self.assertJSONEqual(response.content, expected_json)
+        self.assertEqual(response.json()['results'], expected_json)
+
+    def test_get_user_subscription_list_ordered(self) -> None:
+        expected_json = self._build_expected_json_list(
+            self.test_user.subscriptions.order_by('-frequency', 'pk')
+        )
+
+        first_page = self.client.get(
+            self.subscription_list_url, {'ordering': '-frequency', 'limit': 1}
+        )
+        second_page = self.client.get(first_page.json()['next'])
+
+        self.assertEqual(first_page.json()['count'], 2)
+        self.assertEqual(first_page.json()['results'], expected_json[:1])
+        self.assertEqual(second_page.json()['results'], expected_json[1:])
 
     def test_get_user_subscription_detail(self) -> None:
         tested_subscription = self.test_user.subscriptions.first()
@@ -399,3 +902,28 @@ class TestSubscriptionViewSet(APITestCase):
         self.assertIn(old_subscription.city.pk, received_json_values)
         self.assertIn(old_subscription.user.username, received_json_values)
         self.assertIn(24, received_json_values)
+
+    def test_patch_already_existent_city_subscription(self) -> None:
+        expected_json = ['You can only subscribe to one city once!']
+
+        first_subscription, second_subscription = (
+            self.test_user.subscriptions.order_by('pk')
+        )
+
+        patch_data = {
+            'city': second_subscription.city.pk,
+            'frequency': 12
+        }
+
+        response = self.client.patch(
+            reverse_lazy(
+                'subscription-detail', args=(first_subscription.pk,)
+            ),
+            patch_data
+        )
+
+        first_subscription.refresh_from_db()
+
+        self.assertEqual(response.status_code, 400)
+        self.assertJSONEqual(response.content, expected_json)
+        self.assertEqual(first_subscription.frequency, 3)
@@ -6,7 +6,8 @@ from rest_framework_simplejwt.views import (
 )
 
 from django_weather_reminder.api.views.weather_views import (
-    CityViewSet, CountryViewSet, UserSubscriptionViewSet
+    CityForecastAV, CityForecastHistoryAV, CityViewSet, CountryViewSet,
+    NearestCitiesAV, UserSubscriptionViewSet
 )
 from django_weather_reminder.api.views.auth_views import (
     RegistrationAV,
@@ -19,6 +20,10 @@ country_detail = CountryViewSet.as_view({'get': 'retrieve'})
 
 city_list = CityViewSet.as_view({'get': 'list'})
 city_detail = CityViewSet.as_view({'get': 'retrieve'})
+city_search = CityViewSet.as_view({'get': 'search'})
+city_forecast = CityForecastAV.as_view()
+city_forecast_history = CityForecastHistoryAV.as_view()
+nearest_cities = NearestCitiesAV.as_view()
 
 # Subscriptions.
 subscription_list = UserSubscriptionViewSet.as_view(
@@ -43,10 +48,23 @@ urlpatterns = [
     path(
         'countries/<int:country_pk>/cities/', city_list, name='city-list'
     ),
+    path(
+        'countries/<int:country_pk>/cities/search/',
+        city_search, name='city-search'
+    ),
     path(
         'countries/<int:country_pk>/cities/<int:pk>/',
         city_detail, name='city-detail'
     ),
+    path(
+        'countries/<int:country_pk>/cities/<int:pk>/forecast/',
+        city_forecast, name='city-forecast'
+    ),
+    path(
+        'countries/<int:country_pk>/cities/<int:pk>/history/',
+        city_forecast_history, name='city-forecast-history'
+    ),
+    path('cities/nearest/', nearest_cities, name='city-nearest'),
 
     # Subscriptions.
     path(
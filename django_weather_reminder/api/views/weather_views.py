@@ -1,18 +1,44 @@
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
 from rest_framework import viewsets, permissions
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import SearchFilter
 from django_filters.rest_framework import DjangoFilterBackend
 
+from django_weather_reminder.api.cache import (
+    LocationsCacheMixin, LocationsConditionalMixin
+)
+from django_weather_reminder.api.filters import (
+    CityNameSearchFilter, StableOrderingFilter
+)
+from django_weather_reminder.api.nearest import nearest_cities_index
+from django_weather_reminder.api.pagination import (
+    OrderedListPagination, PkCursorPagination
+)
 from django_weather_reminder.api.serializers.weather_serializers import (
-    CitySerializer, CountrySerializer, SubscriptionSerializer
+    CitySerializer, CountrySerializer, DailyForecastSerializer,
+    ForecastHistoryQuerySerializer, HourlyForecastSerializer,
+    NearestCitiesQuerySerializer, NearestCitySerializer,
+    SubscriptionSerializer
+)
+from django_weather_reminder.api.streaming import (
+    NDJSONRenderer, iter_json_chunks
 )
 from django_weather_reminder.models import (
-    City, Country, Subscription
+    City, Country, CurrentWeather, DailyForecast, HourlyForecast,
+    Subscription
 )
 from django_weather_reminder.api.permissions import IsUserSubscription
 
 
-class CountryViewSet(viewsets.ModelViewSet):
+class CountryViewSet(
+    LocationsConditionalMixin, LocationsCacheMixin, viewsets.ModelViewSet
+):
     """
     list:
     Returns a list of available country.
@@ -27,19 +53,32 @@ class CountryViewSet(viewsets.ModelViewSet):
     queryset = Country.countries.all()
     serializer_class = CountrySerializer
 
+    def get_change_marker(self) -> dict:
+        if self.action == 'retrieve':
+            return Country.countries.change_marker(pk=self.kwargs['pk'])
 
-class CityViewSet(viewsets.ModelViewSet):
+        return Country.countries.change_marker()
+
+
+class CityViewSet(
+    LocationsConditionalMixin, LocationsCacheMixin, viewsets.ModelViewSet
+):
     """
     list:
-    Returns a list of available cities.
+    Returns a cursor-paginated list of available cities.
 
     retrieve:
     Returns a particular cities. If not exists - 404 error.
+
+    search:
+    Takes a q and an optional limit parameters. Returns the best matching
+    cities for an autocomplete, by the prefixes of their name words.
     """
 
-    filter_backends = DjangoFilterBackend, SearchFilter
+    filter_backends = DjangoFilterBackend, CityNameSearchFilter
     filterset_fields = 'active',
-    search_fields = 'name',
+
+    pagination_class = PkCursorPagination
 
     serializer_class = CitySerializer
 
@@ -48,11 +87,136 @@ class CityViewSet(viewsets.ModelViewSet):
 
         return City.cities.country_cities(city_id)
 
+    def get_change_marker(self) -> dict:
+        country_id = self.kwargs['country_pk']
+
+        if self.action == 'retrieve':
+            return City.cities.change_marker(
+                country_id, pk=self.kwargs['pk']
+            )
+
+        return City.cities.change_marker(country_id)
+
+    def search(self, request, *args, **kwargs):
+        return self._get_cached_response(
+            self._search_cities, request, *args, **kwargs
+        )
+
+    def _search_cities(self, request, country_pk):
+        try:
+            limit = int(
+                request.query_params.get(
+                    'limit', settings.CITY_SEARCH_LIMIT
+                )
+            )
+        except ValueError:
+            raise ValidationError({'limit': 'A valid integer is required.'})
+
+        if not 0 < limit <= settings.CITY_SEARCH_MAX_LIMIT:
+            raise ValidationError(
+                {
+                    'limit':
+                        'Must be between 1 and '
+                        f'{settings.CITY_SEARCH_MAX_LIMIT}.'
+                }
+            )
+
+        found_cities = City.cities.search(
+            country_pk, request.query_params.get('q', ''), limit
+        )
+
+        return Response(self.get_serializer(found_cities, many=True).data)
+
+
+class NearestCitiesAV(APIView):
+    """
+    Takes a lat, lon and an optional k parameters. Returns the k cities
+    nearest to the point with their distance in kilometers.
+    """
+
+    @staticmethod
+    def get(request):
+        query = NearestCitiesQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        nearest_cities = nearest_cities_index.find(**query.validated_data)
+
+        return Response(
+            NearestCitySerializer(nearest_cities, many=True).data
+        )
+
+
+class CityForecastAV(APIView):
+    """
+    Returns the hourly and daily weather forecasts of a particular city.
+    If not exists - 404 error.
+    """
+
+    @staticmethod
+    def get(request, country_pk, pk):
+        city = get_object_or_404(
+            City.cities.filter(country=country_pk), pk=pk
+        )
+
+        hourly_forecasts = HourlyForecast.forecasts.city_forecasts(city)
+        daily_forecasts = DailyForecast.forecasts.city_forecasts(city)
+
+        return Response(
+            {
+                'hourly': HourlyForecastSerializer(
+                    hourly_forecasts, many=True
+                ).data,
+                'daily': DailyForecastSerializer(
+                    daily_forecasts, many=True
+                ).data
+            }
+        )
+
+
+class CityForecastHistoryAV(APIView):
+    """
+    Streams the current weather forecasts of a particular city between
+    the from and to query parameters, by default of the last 30 days,
+    as a JSON array or as NDJSON with ?format=ndjson. The rows are
+    read from a server-side cursor and serialized by chunks, so
+    the memory used doesn't depend on the length of the range.
+    If the city doesn't exist - 404 error.
+    """
+
+    renderer_classes = JSONRenderer, NDJSONRenderer
+
+    history_fields = (
+        'date_time', 'temp', 'feels_like', 'pressure', 'humidity',
+        'wind_speed', 'weather_status', 'weather_description'
+    )
+
+    def get(self, request, country_pk, pk):
+        city = get_object_or_404(
+            City.cities.filter(country=country_pk), pk=pk
+        )
+
+        query = ForecastHistoryQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        chunk_size = settings.FORECAST_HISTORY_CHUNK_SIZE
+        rows = CurrentWeather.forecasts.city_history(
+            city, query.validated_data['from'], query.validated_data['to']
+        ).values(*self.history_fields).iterator(chunk_size=chunk_size)
+
+        renderer = request.accepted_renderer
+
+        return StreamingHttpResponse(
+            iter_json_chunks(
+                rows, chunk_size, ndjson=renderer.format == 'ndjson'
+            ),
+            content_type=renderer.media_type
+        )
+
 
 class UserSubscriptionViewSet(viewsets.ModelViewSet):
     """
     list:
-    Returns a list of user's subscription.
+    Returns a cursor-paginated list of user's subscription.
 
     retrieve:
     Returns a particular subscription. If not exists - 404 error.
@@ -64,11 +228,14 @@ class UserSubscriptionViewSet(viewsets.ModelViewSet):
     Updates a user's existent subscription.
     """
 
-    filter_backends = OrderingFilter,
+    filter_backends = StableOrderingFilter,
     ordering_fields = 'frequency',
+    ordering = 'pk',
 
     permission_classes = permissions.IsAuthenticated, IsUserSubscription
 
+    pagination_class = OrderedListPagination
+
     serializer_class = SubscriptionSerializer
 
     def perform_destroy(self, instance):
@@ -76,7 +243,7 @@ class UserSubscriptionViewSet(viewsets.ModelViewSet):
 
         if not instance.city.subscriptions.count():
             instance.city.active = False
-            instance.city.save()
+            instance.city.save(update_fields=('active', 'updated_at'))
 
     def get_queryset(self):
         users_subscriptions = (
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class DjangoWeatherReminderConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'django_weather_reminder'
+
+    def ready(self):
+        from django_weather_reminder import signals  # noqa: F401
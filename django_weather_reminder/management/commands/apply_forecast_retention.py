@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from django_weather_reminder.weather_db.retention import ForecastRetention
+
+
+class Command(BaseCommand):
+    help = (
+        'Rolls the expired hourly forecasts into daily summaries '
+        'and deletes them.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only report what would be summarized and deleted.'
+        )
+        parser.add_argument(
+            '--keep-days', type=int, default=settings.FORECAST_RETENTION_DAYS
+        )
+        parser.add_argument(
+            '--chunk-size', type=int,
+            default=settings.FORECAST_RETENTION_CHUNK_SIZE
+        )
+
+    def handle(self, *args, **options):
+        retention = ForecastRetention(
+            options['keep_days'], options['chunk_size']
+        )
+
+        if options['dry_run']:
+            result = retention.estimate()
+
+            print(
+                f'{result.expired_days} days would be summarized, '
+                f'{result.deleted_count} forecasts would be deleted, '
+                f'{result.dropped_partitions} partitions would be dropped.'
+            )
+
+            return None
+
+        result = retention.apply()
+
+        print(
+            f'{result.expired_days} days were summarized into '
+            f'{result.summaries_count} summaries, '
+            f'{result.deleted_count} forecasts were deleted, '
+            f'{result.dropped_partitions} partitions were dropped.'
+        )
@@ -1,10 +1,58 @@
-from django.core.management import BaseCommand
+from datetime import datetime, timedelta, timezone
 
-from django_weather_reminder.models import CurrentWeather
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from django_weather_reminder.models import City, CurrentWeather
+from django_weather_reminder.weather_db.support.deletion import (
+    delete_in_pk_ranges, report_deletion
+)
 
 
 class Command(BaseCommand):
+    help = (
+        'Deletes the current weather forecasts by ranges of ids, '
+        'or all of them at once with --truncate.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than', type=int, metavar='DAYS',
+            help='Only delete the forecasts older than this number of days.'
+        )
+        parser.add_argument(
+            '--truncate', action='store_true',
+            help='Delete all forecasts with a single TRUNCATE.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=settings.DELETE_CHUNK_SIZE
+        )
+
     def handle(self, *args, **options):
-        CurrentWeather.forecasts.all().delete()
+        if options['truncate']:
+            if options['older_than'] is not None:
+                raise CommandError('--truncate deletes all forecasts.')
+
+            CurrentWeather.forecasts.truncate()
+
+            print('All weather forecasts deleted successfully.')
+
+            return None
+
+        if options['older_than'] is None:
+            condition, params = 'TRUE', ()
+        else:
+            condition, params = 'date_time < %s', (
+                datetime.now(tz=timezone.utc)
+                - timedelta(days=options['older_than']),
+            )
+
+        report_deletion(
+            delete_in_pk_ranges(
+                CurrentWeather, options['chunk_size'], condition, params
+            ),
+            'Forecasts'
+        )
+        City.cities.clear_missing_latest_forecasts()
 
-        print("All weather forecasts deleted successfully.")
+        print('Weather forecasts deleted successfully.')
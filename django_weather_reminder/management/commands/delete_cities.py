@@ -1,10 +1,91 @@
-from django.core.management import BaseCommand
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.db import models
+from django.utils import timezone
 
-from django_weather_reminder.models import City
+from django_weather_reminder.api.cache import (
+    invalidate_cities_geometry, invalidate_locations
+)
+from django_weather_reminder.models import City, Country
+from django_weather_reminder.weather_db.support.deletion import (
+    delete_in_pk_ranges, report_deletion
+)
 
 
 class Command(BaseCommand):
+    help = (
+        'Deletes all cities, or the cities of a country, with the rows '
+        'depending on them, by ranges of ids.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--country', help='Only delete the cities of this country code.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=settings.DELETE_CHUNK_SIZE
+        )
+
+    @staticmethod
+    def _get_country(country_code: str) -> Country:
+        try:
+            return Country.countries.get(code=country_code.upper())
+        except Country.DoesNotExist:
+            raise CommandError(f'No country with the code {country_code}.')
+
+    @staticmethod
+    def _delete_dependents(
+            cities_condition: str, params: list, chunk_size: int
+    ) -> None:
+        # The rows cascading from the cities are deleted first, as the
+        # deletion collector which would do it is bypassed.
+        for relation in City._meta.related_objects:
+            # Deleted through their intermediate models.
+            if relation.many_to_many:
+                continue
+
+            if relation.on_delete is not models.CASCADE:
+                raise CommandError(
+                    f'{relation.related_model.__name__} doesn\'t cascade.'
+                )
+
+            condition = (
+                f'{relation.field.column} IN ('
+                f' SELECT id FROM {City._meta.db_table}'
+                f' WHERE {cities_condition}'
+                ')'
+            )
+
+            report_deletion(
+                delete_in_pk_ranges(
+                    relation.related_model, chunk_size, condition, params
+                ),
+                relation.related_model.__name__
+            )
+
     def handle(self, *args, **options):
-        City.cities.all().delete()
+        if options['country']:
+            country = self._get_country(options['country'])
+
+            cities_condition, params = 'country_id = %s', [country.pk]
+            countries = Country.countries.filter(pk=country.pk)
+        else:
+            cities_condition, params = 'TRUE', []
+            countries = Country.countries.all()
+
+        self._delete_dependents(
+            cities_condition, params, options['chunk_size']
+        )
+        report_deletion(
+            delete_in_pk_ranges(
+                City, options['chunk_size'], cities_condition, params
+            ),
+            'City'
+        )
+
+        # The model signals aren't sent by the deletion.
+        invalidate_locations()
+        invalidate_cities_geometry()
+        countries.update(updated_at=timezone.now())
 
-        print("All cities deleted successfully.")
+        print("Cities deleted successfully.")
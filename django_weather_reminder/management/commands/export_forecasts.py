@@ -0,0 +1,95 @@
+import os
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from django_weather_reminder.models import CurrentWeather
+from django_weather_reminder.weather_db.exporters import (
+    ForecastsExporter, pyarrow
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Exports the current weather forecasts in date order to gzip '
+        'compressed CSV or Parquet files, streaming them in constant memory.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', help='Directory of the files.')
+        parser.add_argument(
+            '--format', choices=('csv', 'parquet'), default='csv',
+            help='Parquet requires pyarrow.'
+        )
+        parser.add_argument(
+            '--country', help='Only export the cities of this country code.'
+        )
+        parser.add_argument(
+            '--city', type=int, action='append', dest='cities',
+            help='Only export this city id, can be repeated.'
+        )
+        parser.add_argument(
+            '--since', type=date.fromisoformat,
+            help='First UTC day of the exported forecasts, YYYY-MM-DD.'
+        )
+        parser.add_argument(
+            '--until', type=date.fromisoformat,
+            help='Last UTC day of the exported forecasts, YYYY-MM-DD.'
+        )
+        parser.add_argument(
+            '--rows-per-file', type=int,
+            default=settings.FORECAST_EXPORT_ROWS_PER_FILE
+        )
+        parser.add_argument(
+            '--chunk-size', type=int,
+            default=settings.FORECAST_EXPORT_CHUNK_SIZE
+        )
+
+    @staticmethod
+    def _get_day_start(day: date) -> datetime:
+        return datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc)
+
+    def handle(self, *args, **options):
+        if options['format'] == 'parquet' and pyarrow is None:
+            raise CommandError('The Parquet export requires pyarrow.')
+
+        forecasts = CurrentWeather.forecasts.order_by('date_time', 'pk')
+
+        if options['country']:
+            forecasts = forecasts.filter(
+                city__country__code=options['country'].upper()
+            )
+
+        if options['cities']:
+            forecasts = forecasts.filter(city__in=options['cities'])
+
+        if options['since']:
+            forecasts = forecasts.filter(
+                date_time__gte=self._get_day_start(options['since'])
+            )
+
+        if options['until']:
+            forecasts = forecasts.filter(
+                date_time__lt=self._get_day_start(
+                    options['until'] + timedelta(days=1)
+                )
+            )
+
+        os.makedirs(options['directory'], exist_ok=True)
+
+        exporter = ForecastsExporter(
+            options['directory'], options['format'],
+            options['rows_per_file'], options['chunk_size']
+        )
+
+        started = time.perf_counter()
+        result = exporter.export(forecasts)
+        elapsed = time.perf_counter() - started
+
+        print(
+            f'Exported {result.rows_count} forecasts to '
+            f'{len(result.paths)} files in {elapsed:.1f} s, '
+            f'{result.rows_count / elapsed:.0f} rows/s.'
+        )
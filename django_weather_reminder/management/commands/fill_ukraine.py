@@ -1,37 +1,31 @@
-from typing import Type
-
+from django.conf import settings
 from django.core.management import BaseCommand
 
-from django_weather_reminder.weather_db.fillers import (
-    UkraineCitiesFromJson
+from django_weather_reminder.weather_db.importers import (
+    create_countries, import_locations_file
 )
-from django_weather_reminder.models import Country
 
 
 class Command(BaseCommand):
     help = 'This command populates the database with countries and cities.'
 
     @staticmethod
-    def create_ukraine() -> Type[Country]:
-        try:
-            ukraine = Country.countries.get(name='Ukraine', code='UA')
-        except Country.DoesNotExist:
-            ukraine = Country.countries.create(name='Ukraine', code='UA')
-
-        return ukraine
-
-    @classmethod
-    def fill_cities(cls):
+    def fill_cities():
         locations_json = (
             'django_weather_reminder/weather_db/'
             'locations_data/ua_cities.json'
         )
 
-        cls.create_ukraine()
-
-        ukraine_parser = UkraineCitiesFromJson(locations_json)
+        create_countries(('UA',), {'UA': 'Ukraine'})
+        result = import_locations_file(
+            locations_json, 'UA', settings.CITIES_IMPORT_CHUNK_SIZE,
+            settings.CITIES_IMPORT_PROGRESS_EVERY
+        )
 
-        ukraine_parser.write_cities_to_db()
+        print(
+            f'The filling was successful. Processed {result.processed} '
+            f'cities, imported {result.imported} new.'
+        )
 
     def handle(self, *args, **options):
         self.fill_cities()
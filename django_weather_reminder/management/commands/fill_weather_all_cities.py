@@ -1,21 +1,92 @@
-import warnings
-
-from django.core.management import BaseCommand
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
 
 from django_weather_reminder.models import City
-from django_weather_reminder.weather_db.fillers import CurrentWeather
+from django_weather_reminder.weather_db.checkpoints import FillCheckpoint
+from django_weather_reminder.weather_db.fillers import (
+    CurrentWeather, FillResult
+)
 
 
 class Command(BaseCommand):
+    help = (
+        'Fills the current weather of all cities, saving a checkpoint '
+        'after every chunk of cities so an interrupted run can be resumed.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Continue after the last checkpoint of the same scope.'
+        )
+        parser.add_argument(
+            '--country', help='Only fill the cities of this country code.'
+        )
+        parser.add_argument(
+            '--limit', type=int,
+            help='Maximum number of cities filled by this run.'
+        )
+        parser.add_argument(
+            '--concurrency', type=int,
+            default=settings.WEATHER_FILL_CONCURRENCY
+        )
+        parser.add_argument(
+            '--chunk-size', type=int,
+            default=settings.WEATHER_FILL_CHECKPOINT_EVERY,
+            help='Number of cities between two checkpoints.'
+        )
+        parser.add_argument(
+            '--checkpoint', default=settings.WEATHER_FILL_CHECKPOINT_PATH
+        )
+
+    @staticmethod
+    def _get_start_pk(
+            checkpoint: FillCheckpoint, scope: dict, resume: bool
+    ) -> int:
+        if not resume or (saved := checkpoint.load()) is None:
+            return 0
+
+        if saved['scope'] != scope:
+            raise CommandError(
+                f'The checkpoint was saved for {saved["scope"]}, '
+                f'not for {scope}.'
+            )
+
+        return saved['last_pk']
+
     def handle(self, *args, **options):
-        cities = City.cities.all()
-        cities_length = len(cities)
+        country_code = options['country'] and options['country'].upper()
+
+        checkpoint = FillCheckpoint(options['checkpoint'])
+        scope = {'country': country_code}
+        start_pk = self._get_start_pk(checkpoint, scope, options['resume'])
+
+        cities = City.cities.filter(pk__gt=start_pk)
+
+        if country_code:
+            cities = cities.filter(country__code=country_code)
+
+        weather_parser = CurrentWeather(
+            settings.WEATHER_FILL_GRID_PRECISION
+        )
+        total = FillResult()
+
+        for last_pk, result in weather_parser.fill_cities_weather_in_chunks(
+                cities, options['chunk_size'], options['concurrency'],
+                settings.WEATHER_FILL_BATCH_SIZE, limit=options['limit']
+        ):
+            checkpoint.save(last_pk, scope)
+            total += result
 
-        weather_parser = CurrentWeather()
+            print(
+                f'Filled the cities up to id {last_pk}: '
+                f'{total.refreshed} refreshed so far.'
+            )
 
-        for i, city in enumerate(cities):
-            print(f'Filling a {i + 1} of {cities_length} cities')
-            with warnings.catch_warnings():
-                weather_parser.fill_city_weather(city)
+        if not options['limit']:
+            checkpoint.clear()
 
-        print('The filling was successful.')
+        print(
+            f'The filling was successful: {total.refreshed} cities '
+            f'refreshed, {total.skipped_unchanged} skipped as unchanged.'
+        )
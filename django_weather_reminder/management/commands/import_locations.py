@@ -0,0 +1,122 @@
+import os
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from typing import Any, Iterator
+
+import django
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.db import connections
+
+from django_weather_reminder.weather_db.importers import (
+    ImportResult, create_countries, import_locations_file,
+    read_country_codes
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Imports the cities of JSON, CSV and GeoNames files in parallel '
+        'worker processes, creating their countries first. Countries '
+        'other than the --country one are named after their code.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('files', nargs='+')
+        parser.add_argument(
+            '--country',
+            help='Country code of the files without one per city.'
+        )
+        parser.add_argument(
+            '--country-name',
+            help=(
+                'Name of the --country country if it has to be created, '
+                'its code by default.'
+            )
+        )
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Maximum number of worker processes.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int,
+            default=settings.CITIES_IMPORT_CHUNK_SIZE
+        )
+
+    @staticmethod
+    def _iter_results(
+            futures: dict[Future, str], failed_files: list[str]
+    ) -> Iterator[tuple[str, Any]]:
+        for future in as_completed(futures):
+            filepath = futures[future]
+
+            try:
+                yield filepath, future.result()
+            except Exception as error:
+                print(f'{filepath}: failed, {error}')
+                failed_files.append(filepath)
+
+    def handle(self, *args, **options):
+        country_names = (
+            {options['country']: options['country_name']}
+            if options['country'] and options['country_name'] else None
+        )
+
+        # The workers must open their own connections, not share
+        # the sockets of the parent.
+        connections.close_all()
+
+        total = ImportResult()
+        failed_files = []
+
+        with ProcessPoolExecutor(
+                min(options['workers'], len(options['files'])),
+                initializer=django.setup
+        ) as executor:
+            codes_futures = {
+                executor.submit(
+                    read_country_codes, filepath, options['country']
+                ): filepath
+                for filepath in options['files']
+            }
+            codes = set()
+
+            for _, file_codes in self._iter_results(
+                    codes_futures, failed_files
+            ):
+                codes |= file_codes
+
+            # In a short transaction of the parent, so the long city
+            # transactions of the workers never lock new countries.
+            try:
+                create_countries(codes, country_names)
+            except ValueError as error:
+                raise CommandError(error)
+            finally:
+                connections.close_all()
+
+            import_futures = {
+                executor.submit(
+                    import_locations_file, filepath, options['country'],
+                    options['chunk_size'],
+                    settings.CITIES_IMPORT_PROGRESS_EVERY
+                ): filepath
+                for filepath in options['files']
+                if filepath not in failed_files
+            }
+
+            for filepath, result in self._iter_results(
+                    import_futures, failed_files
+            ):
+                print(
+                    f'{filepath}: processed {result.processed} cities, '
+                    f'imported {result.imported}.'
+                )
+                total += result
+
+        print(
+            f'Processed {total.processed} cities, '
+            f'imported {total.imported} new.'
+        )
+
+        if failed_files:
+            raise CommandError(f'Failed files: {", ".join(failed_files)}')
@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from django_weather_reminder.weather_db.partitions import ForecastPartitions
+
+
+class Command(BaseCommand):
+    help = (
+        'Creates the monthly partitions of the current weather forecasts '
+        'for the next months. With --convert, partitions the forecasts '
+        'table first, locking it while the forecasts are copied.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--convert', action='store_true',
+            help='Turn the plain forecasts table into a partitioned one.'
+        )
+        parser.add_argument(
+            '--ahead', type=int, default=settings.FORECAST_PARTITIONS_AHEAD,
+            help='Number of months after the current one to create.'
+        )
+
+    def handle(self, *args, **options):
+        partitions = ForecastPartitions()
+
+        if options['convert']:
+            if partitions.is_partitioned():
+                raise CommandError('The forecasts are already partitioned.')
+
+            months = partitions.convert(options['ahead'])
+
+            print(
+                f'The forecasts were partitioned into {len(months)} '
+                f'monthly partitions, from {months[0]:%Y-%m} '
+                f'to {months[-1]:%Y-%m}.'
+            )
+
+            return None
+
+        if not partitions.is_partitioned():
+            raise CommandError(
+                'The forecasts are not partitioned, use --convert first.'
+            )
+
+        created_months = partitions.create_ahead(options['ahead'])
+
+        if not created_months:
+            print('The partitions of these months already exist.')
+
+            return None
+
+        print(
+            f'Created {len(created_months)} partitions: '
+            f'{", ".join(f"{month:%Y-%m}" for month in created_months)}.'
+        )
@@ -0,0 +1,12 @@
+from django.core.management import BaseCommand
+
+from django_weather_reminder.models import City
+
+
+class Command(BaseCommand):
+    help = 'Points every city to its latest stored weather forecast.'
+
+    def handle(self, *args, **options):
+        City.cities.sync_latest_forecasts()
+
+        print('The latest forecasts were synced successfully.')
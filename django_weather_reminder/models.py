@@ -1,15 +1,55 @@
-from typing import Union
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Iterable, Iterator, Union
 
-from django.db import models
+from django.db import connection, models, transaction
 from django.contrib.auth.models import AbstractUser, UserManager
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.db.models.functions import Collate, Greatest, Length, Upper
 
 from django_weather_reminder.validators import validate_frequency
+from django_weather_reminder.weather_db.support.upsert import bulk_upsert
 
 # Models Managers.
 
+# Upper-cased city name in the C collation, whose index in
+# city_name_prefix_idx serves LIKE prefix lookups in any database
+# collation.
+CITY_NAME_KEY = Collate(Upper('name'), 'C')
 
-class CityManager(models.Manager):
+
+class CityQuerySet(models.QuerySet):
+    def name_prefix_search(self, prefix: str) -> models.QuerySet['City']:
+        """Returns the cities whose name starts with the prefix."""
+
+        found_cities = self.alias(name_key=CITY_NAME_KEY).filter(
+            name_key__startswith=Upper(models.Value(prefix))
+        )
+
+        return found_cities
+
+    def name_search(self, query: str) -> models.QuerySet['City']:
+        """
+        Returns the cities whose name contains every word of the query,
+        ranked 1 if it starts with the first word and 0 otherwise.
+        """
+
+        if not (words := query.split()):
+            return self.none()
+
+        found_cities = self
+
+        for word in words:
+            found_cities = found_cities.filter(name__icontains=word)
+
+        return found_cities.annotate(
+            rank=models.Case(
+                models.When(name__istartswith=words[0], then=1.0),
+                default=0.0, output_field=models.FloatField()
+            )
+        )
+
+
+class CityManager(models.Manager.from_queryset(CityQuerySet)):
     def country_cities(
             self, country: Union['Country', int]
     ) -> models.QuerySet['City']:
@@ -24,6 +64,116 @@ class CityManager(models.Manager):
 
         return active_cities
 
+    def search(
+            self, country: Union['Country', int], query: str, limit: int
+    ) -> list['City']:
+        """
+        Returns at most limit cities of a country for an autocomplete.
+        The cities whose name starts with the query come first, in the
+        order of city_name_prefix_idx, so their lookup stops after limit
+        index entries. The other cities found by name_search follow, the
+        best ranked and the shortest names first, and are only searched
+        for when there are too few of the first ones.
+        """
+
+        if not (query := query.strip()):
+            return []
+
+        country_cities = self.filter(country=country).select_related(
+            'country'
+        )
+        found_cities = list(
+            country_cities.name_prefix_search(query).order_by(
+                'name_key', 'pk'
+            )[:limit]
+        )
+
+        if len(found_cities) < limit:
+            found_cities += country_cities.name_search(query).exclude(
+                pk__in=[city.pk for city in found_cities]
+            ).order_by(
+                '-rank', Length('name'), 'name', 'pk'
+            )[:limit - len(found_cities)]
+
+        return found_cities
+
+    def change_marker(
+            self, country: Union['Country', int], **filters
+    ) -> dict:
+        """
+        Returns the last modification time and the number of the matched
+        cities of a country. A change of the country counts as well.
+        """
+
+        marker = self.filter(country=country, **filters).aggregate(
+            last_modified=Greatest(
+                models.Max('updated_at'), models.Max('country__updated_at')
+            ),
+            count=models.Count('pk')
+        )
+
+        return marker
+
+    def update_latest_forecasts(self, forecasts_ids: Iterable[int]) -> None:
+        """
+        Points the cities of the given forecasts to them, unless a city
+        already points to a newer forecast. Runs as a single UPDATE.
+        """
+
+        city_table = self.model._meta.db_table
+        forecast_table = CurrentWeather._meta.db_table
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {city_table} AS city '
+                'SET latest_forecast_id = new.id '
+                'FROM ('
+                '  SELECT DISTINCT ON (city_id) id, city_id, date_time '
+                f' FROM {forecast_table} WHERE id = ANY(%s) '
+                '  ORDER BY city_id, date_time DESC, id DESC'
+                ') AS new '
+                'WHERE city.id = new.city_id AND NOT EXISTS ('
+                f' SELECT 1 FROM {forecast_table} AS latest '
+                ' WHERE latest.id = city.latest_forecast_id '
+                ' AND latest.date_time > new.date_time'
+                ')',
+                [list(forecasts_ids)]
+            )
+
+    def clear_missing_latest_forecasts(self) -> None:
+        """Unsets the latest forecasts which were deleted in bulk."""
+
+        city_table = self.model._meta.db_table
+        forecast_table = CurrentWeather._meta.db_table
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {city_table} AS city '
+                'SET latest_forecast_id = NULL '
+                'WHERE latest_forecast_id IS NOT NULL AND NOT EXISTS ('
+                f' SELECT 1 FROM {forecast_table}'
+                ' WHERE id = city.latest_forecast_id'
+                ')'
+            )
+
+    def sync_latest_forecasts(self) -> None:
+        """Points every city to its latest stored forecast."""
+
+        city_table = self.model._meta.db_table
+        forecast_table = CurrentWeather._meta.db_table
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {city_table} AS city '
+                'SET latest_forecast_id = latest.id '
+                'FROM ('
+                '  SELECT DISTINCT ON (city_id) id, city_id '
+                f' FROM {forecast_table} '
+                '  ORDER BY city_id, date_time DESC, id DESC'
+                ') AS latest '
+                'WHERE city.id = latest.city_id'
+            )
+
 
 class CurrentWeatherManager(models.Manager):
     def create_forecast(
@@ -41,17 +191,192 @@ class CurrentWeatherManager(models.Manager):
 
         return current_forecast
 
+    def bulk_create_forecasts(
+            self, forecasts: list['CurrentWeather']
+    ) -> list['CurrentWeather']:
+        with transaction.atomic():
+            forecasts = self.bulk_create(forecasts)
+
+            City.cities.update_latest_forecasts(
+                forecast.pk for forecast in forecasts
+            )
+
+        return forecasts
+
     def latest_current_forecast(
             self, country: Union['Country', int], city: Union['City', int]
     ) -> 'CurrentWeather':
         current_forecast = self.filter(
-            city__country=country, city=city
+            latest_for_city=city, latest_for_city__country=country
         ).select_related(
             'city'
-        ).order_by('date_time').last()
+        ).first()
 
         return current_forecast
 
+    def latest_cities_forecasts(
+            self, cities: Iterable[Union['City', int]]
+    ) -> dict[int, 'CurrentWeather']:
+        """Returns the latest forecast of the given cities by city pk."""
+
+        forecasts = self.filter(
+            latest_for_city__in=cities
+        ).select_related('city')
+
+        return {forecast.city_id: forecast for forecast in forecasts}
+
+    def city_history(
+            self, city: Union['City', int], since: datetime, until: datetime
+    ) -> models.QuerySet:
+        """Returns the forecasts of a city from since to until, in order."""
+
+        return self.filter(
+            city=city, date_time__gte=since, date_time__lt=until
+        ).order_by('date_time')
+
+    def summarize_day(self, day: date) -> int:
+        """
+        Rolls the forecasts of the given UTC day into daily weather summaries,
+        skipping cities which already have a summary of that day.
+        Returns the number of created summaries.
+        """
+
+        day_start = datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {DailyWeather._meta.db_table} ('
+                '  city_id, date, temp_min, temp_max, temp_mean,'
+                '  weather_status, samples_count'
+                ') '
+                'SELECT city_id, %s, MIN(temp), MAX(temp), AVG(temp), '
+                '  MODE() WITHIN GROUP (ORDER BY weather_status), COUNT(*) '
+                f'FROM {self.model._meta.db_table} '
+                'WHERE date_time >= %s AND date_time < %s '
+                'GROUP BY city_id '
+                'ON CONFLICT (city_id, date) DO NOTHING',
+                [day, day_start, day_start + timedelta(days=1)]
+            )
+
+            return cursor.rowcount
+
+    def truncate(self) -> None:
+        """
+        Deletes all forecasts at once and unsets the latest forecasts
+        of the cities, which have no database constraint to them.
+        """
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'TRUNCATE {self.model._meta.db_table}')
+            cursor.execute(
+                f'UPDATE {City._meta.db_table} SET latest_forecast_id = NULL '
+                'WHERE latest_forecast_id IS NOT NULL'
+            )
+
+    def count_older_than(
+            self, date_time: datetime, table: str | None = None
+    ) -> int:
+        """
+        Returns the number of forecasts delete_older_than would delete
+        with the same arguments.
+        """
+
+        forecast_table = table or self.model._meta.db_table
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT COUNT(*) FROM {forecast_table} AS forecast '
+                'WHERE date_time < %s AND NOT EXISTS ('
+                f' SELECT 1 FROM {City._meta.db_table}'
+                ' WHERE latest_forecast_id = forecast.id'
+                ')',
+                [date_time]
+            )
+
+            return cursor.fetchone()[0]
+
+    def delete_older_than(
+            self, date_time: datetime, chunk_size: int,
+            table: str | None = None
+    ) -> Iterator[int]:
+        """
+        Deletes the forecasts older than date_time, except the latest
+        forecasts of the cities, by chunks of chunk_size rows. Every chunk
+        is deleted by its own statement, so locks are held only briefly.
+        Only the forecasts of the given table are deleted, if it's given,
+        such as a partition of the forecasts table.
+        Yields the number of forecasts deleted by every chunk.
+        """
+
+        forecast_table = table or self.model._meta.db_table
+        city_table = City._meta.db_table
+
+        while True:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'DELETE FROM {forecast_table} WHERE id IN ('
+                    f' SELECT id FROM {forecast_table} AS forecast'
+                    ' WHERE date_time < %s AND NOT EXISTS ('
+                    f'  SELECT 1 FROM {city_table}'
+                    '  WHERE latest_forecast_id = forecast.id'
+                    ' ) LIMIT %s'
+                    ')',
+                    [date_time, chunk_size]
+                )
+                deleted_count = cursor.rowcount
+
+            if not deleted_count:
+                return None
+
+            yield deleted_count
+
+            if deleted_count < chunk_size:
+                return None
+
+
+class CityForecastManager(models.Manager):
+    def city_forecasts(
+            self, city: Union['City', int]
+    ) -> models.QuerySet:
+        return self.filter(city=city).order_by('date_time')
+
+    def upsert_forecasts(
+            self, forecasts: list, cities_ids: Iterable[int],
+            outdated_before: datetime
+    ) -> None:
+        """
+        Replaces the forecasts of the given cities: the given forecasts are
+        inserted or update the stored ones with the same city and date_time,
+        and the forecasts before outdated_before are deleted.
+        """
+
+        updated_fields = [
+            field.name for field in self.model._meta.concrete_fields
+            if field.name not in ('id', 'city', 'date_time')
+        ]
+
+        with transaction.atomic():
+            bulk_upsert(forecasts, ('city', 'date_time'), updated_fields)
+
+            self.filter(
+                city__in=cities_ids, date_time__lt=outdated_before
+            ).delete()
+
+
+class CountryManager(models.Manager):
+    def change_marker(self, **filters) -> dict:
+        """
+        Returns the last modification time and the number
+        of the matched countries.
+        """
+
+        marker = self.filter(**filters).aggregate(
+            last_modified=models.Max('updated_at'),
+            count=models.Count('pk')
+        )
+
+        return marker
+
 
 class CustomUserManager(UserManager):
     def with_subscriptions(self, frequency: int) -> models.QuerySet['User']:
@@ -66,7 +391,7 @@ class CustomUserManager(UserManager):
     ) -> models.QuerySet['User']:
         users = self.filter(
             subscriptions__frequency=frequency
-        ).prefetch_related(
+        ).distinct().prefetch_related(
             'subscriptions', 'city_subscriptions',
             'city_subscriptions__country'
         )
@@ -106,8 +431,61 @@ class City(models.Model):
         'Country', on_delete=models.CASCADE, related_name='cities'
     )
 
+    # Maintained by the fill path. Has no database constraint, so forecasts
+    # can be deleted in bulk without touching the cities table.
+    latest_forecast = models.OneToOneField(
+        'CurrentWeather', on_delete=models.SET_NULL, null=True,
+        editable=False, related_name='latest_for_city', db_constraint=False
+    )
+
+    updated_at = models.DateTimeField(auto_now=True)
+
     cities = CityManager()
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['country', 'active'], name='city_country_active_idx'
+            ),
+            models.Index(
+                fields=['country', 'updated_at'],
+                name='city_country_updated_idx'
+            ),
+            models.Index(
+                models.F('country'), CITY_NAME_KEY,
+                name='city_name_prefix_idx'
+            ),
+            models.Index(
+                fields=['active'], condition=models.Q(active=True),
+                name='city_active_idx'
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['country', 'name', 'lat', 'lon'],
+                name='unique_city_location'
+            ),
+        ]
+
+    def save(
+            self, force_insert=False, force_update=False, using=None,
+            update_fields=None
+    ):
+        # The latest forecast is only written by the fill path, so a full
+        # save of an existing city must not write back a stale pointer.
+        if update_fields is None and not (
+                self._state.adding or force_insert
+        ):
+            deferred_fields = self.get_deferred_fields()
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name != 'latest_forecast'
+                and field.attname not in deferred_fields
+            ]
+
+        super().save(force_insert, force_update, using, update_fields)
+
     def __str__(self):
         return f'{self.name} | {self.country.name}'
 
@@ -124,12 +502,27 @@ class Subscription(models.Model):
 
     subscriptions = SubscriptionManager()
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['frequency', 'user'],
+                name='subscription_frequency_idx'
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'city'], name='unique_user_city_subscription'
+            ),
+        ]
+
 
 class Country(models.Model):
     name = models.CharField(max_length=100, unique=True)
     code = models.CharField(max_length=2, unique=True)
 
-    countries = models.Manager()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    countries = CountryManager()
 
     def __str__(self):
         return self.name
@@ -160,3 +553,81 @@ class CurrentWeather(AbstractWeatherForecast):
     )
 
     forecasts = CurrentWeatherManager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['city', 'date_time'], name='forecast_city_date_idx'
+            ),
+            models.Index(fields=['date_time'], name='forecast_date_idx'),
+        ]
+
+
+class HourlyForecast(AbstractWeatherForecast):
+    temp = models.FloatField()
+    feels_like = models.FloatField()
+
+    date_time = models.DateTimeField()
+
+    city = models.ForeignKey(
+        City, on_delete=models.CASCADE, related_name='hourly_forecasts'
+    )
+
+    forecasts = CityForecastManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['city', 'date_time'],
+                name='unique_city_hourly_forecast'
+            ),
+        ]
+
+
+class DailyForecast(AbstractWeatherForecast):
+    temp = models.FloatField()
+    temp_min = models.FloatField()
+    temp_max = models.FloatField()
+    feels_like = models.FloatField()
+
+    date_time = models.DateTimeField()
+
+    city = models.ForeignKey(
+        City, on_delete=models.CASCADE, related_name='daily_forecasts'
+    )
+
+    forecasts = CityForecastManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['city', 'date_time'],
+                name='unique_city_daily_forecast'
+            ),
+        ]
+
+
+class DailyWeather(models.Model):
+    """Summary of the hourly forecasts of a city for a single UTC day."""
+
+    date = models.DateField()
+
+    temp_min = models.FloatField()
+    temp_max = models.FloatField()
+    temp_mean = models.FloatField()
+
+    weather_status = models.CharField(max_length=20)
+    samples_count = models.PositiveIntegerField()
+
+    city = models.ForeignKey(
+        City, on_delete=models.CASCADE, related_name='daily_weather'
+    )
+
+    summaries = models.Manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['city', 'date'], name='unique_city_daily_weather'
+            ),
+        ]
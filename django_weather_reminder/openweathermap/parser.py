@@ -1,26 +1,80 @@
+from functools import lru_cache
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from django.conf import settings
 
 import os
 
+RETRY_STATUSES = 429, 500, 502, 503, 504
+
+
+def build_session(
+        pool_size: int, max_retries: int, backoff_factor: float
+) -> requests.Session:
+    """
+    Returns a session which keeps up to pool_size connections alive
+    and retries GET requests with exponential backoff on connection errors
+    and on 429/5xx responses.
+    """
+
+    retry = Retry(
+        total=max_retries, backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUSES, allowed_methods=('GET',)
+    )
+    adapter = HTTPAdapter(pool_maxsize=pool_size, max_retries=retry)
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    return session
+
+
+@lru_cache(maxsize=None)
+def get_shared_session() -> requests.Session:
+    """
+    Returns a session shared by all parsers of the current process,
+    so a Celery worker reuses its connections across tasks.
+    """
+
+    return build_session(
+        settings.OPENWEATHERMAP_POOL_SIZE,
+        settings.OPENWEATHERMAP_MAX_RETRIES,
+        settings.OPENWEATHERMAP_RETRY_BACKOFF
+    )
+
 
 class OpenWeatherMapParser:
-    def __init__(self, api_key: str = os.getenv('OPENWEATHERMAP_KEY')):
+    def __init__(
+            self, api_key: str = os.getenv('OPENWEATHERMAP_KEY'),
+            session: requests.Session | None = None,
+            base_url: str = 'https://api.openweathermap.org/data/2.5',
+            timeout: tuple[float, float] | None = None
+    ):
         self._api_key = api_key
-        self._base_onecall_url = (
-            'https://api.openweathermap.org/data/2.5/onecall'
-        )
-        self._base_current_url = (
-            'https://api.openweathermap.org/data/2.5/weather'
+        self._session = session or get_shared_session()
+        self._timeout = timeout or (
+            settings.OPENWEATHERMAP_CONNECT_TIMEOUT,
+            settings.OPENWEATHERMAP_READ_TIMEOUT
         )
+        self._base_onecall_url = f'{base_url}/onecall'
+        self._base_current_url = f'{base_url}/weather'
+
+    def _send_request(self, url: str, params: dict) -> dict:
+        response = self._session.get(url, params=params, timeout=self._timeout)
+        response.raise_for_status()
+
+        return response.json()
 
     def _send_city_request(self, city_lat: float, city_lon: float) -> dict:
         params = {
             'units': 'metric', 'appid': self._api_key,
             'exclude': 'current,minutely', 'lat': city_lat, 'lon': city_lon,
         }
-        forecast_data = requests.get(
-            self._base_onecall_url, params=params
-        ).json()
+        forecast_data = self._send_request(self._base_onecall_url, params)
 
         return forecast_data
 
@@ -69,9 +123,9 @@ class OpenWeatherMapParser:
             'lat': city_lat, 'lon': city_lon
         }
 
-        current_forecast_data = requests.get(
-            self._base_current_url, params=params
-        ).json()
+        current_forecast_data = self._send_request(
+            self._base_current_url, params
+        )
 
         return current_forecast_data
 
@@ -1,31 +1,99 @@
 import os
-from datetime import datetime
+from collections import defaultdict
+from datetime import datetime, timedelta
 from typing import Literal
 
-from django.core.mail import send_mail
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
 
-from django_weather_reminder.models import City, User
+from django_weather_reminder.models import City, Subscription, User
 from django_weather_reminder.models import CurrentWeather as WeatherForecast
-from django_weather_reminder.weather_db.fillers import CurrentWeather
+from django_weather_reminder.weather_db.fillers import (
+    CityForecasts, CurrentWeather, FillResult
+)
+from django_weather_reminder.weather_db.support import geo
 
 
-def fill_weather_active_cities() -> None:
-    filler = CurrentWeather()
+def get_fresh_ttl() -> timedelta | None:
+    if not settings.WEATHER_FILL_FRESH_TTL_MINUTES:
+        return None
+
+    return timedelta(minutes=settings.WEATHER_FILL_FRESH_TTL_MINUTES)
+
 
+def split_active_cities_ids(batch_size: int) -> list[list[int]]:
+    """
+    Splits the ids of the active cities into batches of about batch_size
+    ids. If the fill shares requests by grid cell, the batches are made
+    of whole grid cells, so two cities of a cell are never requested
+    by two batches. Only a cell larger than batch_size makes a larger
+    batch. Otherwise cities are ordered by country, so a batch covers
+    a single region.
+    """
+
+    precision = settings.WEATHER_FILL_GRID_PRECISION
     active_cities = City.cities.active_cities()
 
-    for city in active_cities:
-        filler.fill_city_weather(city)
+    if precision is None:
+        cities_ids = list(
+            active_cities.order_by('country', 'pk').values_list(
+                'pk', flat=True
+            )
+        )
+
+        return [
+            cities_ids[i:i + batch_size]
+            for i in range(0, len(cities_ids), batch_size)
+        ]
+
+    cells = defaultdict(list)
+
+    for city_id, lat, lon in active_cities.order_by('pk').values_list(
+            'pk', 'lat', 'lon'
+    ):
+        cells[geo.get_grid_cell(lat, lon, precision)].append(city_id)
+
+    batches = [[]]
+
+    for cell in sorted(cells):
+        if batches[-1] and len(batches[-1]) + len(cells[cell]) > batch_size:
+            batches.append([])
+
+        batches[-1].extend(cells[cell])
+
+    return batches if batches[0] else []
+
+
+def fill_weather_cities(cities_ids: list[int]) -> FillResult:
+    filler = CurrentWeather(settings.WEATHER_FILL_GRID_PRECISION)
+
+    cities = City.cities.filter(pk__in=cities_ids)
+
+    return filler.fill_cities_weather(
+        cities, settings.WEATHER_FILL_CONCURRENCY,
+        settings.WEATHER_FILL_BATCH_SIZE, get_fresh_ttl()
+    )
+
+
+def fill_forecasts_cities(cities_ids: list[int]) -> int:
+    filler = CityForecasts(settings.WEATHER_FILL_GRID_PRECISION)
+
+    cities = City.cities.filter(pk__in=cities_ids)
+
+    return filler.fill_cities_forecasts(
+        cities, settings.WEATHER_FILL_CONCURRENCY,
+        settings.WEATHER_FILL_BATCH_SIZE
+    )
 
 
 def datetime_to_readable_format(date_time: datetime) -> str:
     return date_time.strftime('%m/%d/%Y %H:%M')
 
 
-def _send_weather_forecast_mail(
+def _build_weather_forecast_mail(
         user: User, forecast: WeatherForecast
-) -> None:
-    send_mail(
+) -> EmailMessage:
+    return EmailMessage(
         f'Weather in {forecast.city.name}',
         (
             'Quick report:\n'
@@ -44,19 +112,66 @@ def _send_weather_forecast_mail(
     )
 
 
+def _send_mails(messages: list[EmailMessage], batch_size: int) -> None:
+    """Sends the messages over one SMTP connection per batch_size messages."""
+
+    for i in range(0, len(messages), batch_size):
+        with get_connection() as connection:
+            connection.send_messages(messages[i:i + batch_size])
+
+
 Frequency = Literal[1, 3, 6, 12, 24]
 
 
-def send_users_weather_forecast(subscription_frequency: Frequency) -> None:
+def split_subscribers_ids(
+        subscription_frequency: Frequency, shard_size: int
+) -> list[tuple[int, int]]:
+    """
+    Splits the ids of the users with subscriptions of the given frequency
+    into inclusive (first id, last id) ranges of shard_size users each,
+    so sparse ids never make empty shards.
+    """
+
+    users_ids = list(
+        Subscription.subscriptions.filter(
+            frequency=subscription_frequency
+        ).order_by('user').values_list('user', flat=True).distinct()
+    )
+
+    return [
+        (users_ids[i], users_ids[min(i + shard_size, len(users_ids)) - 1])
+        for i in range(0, len(users_ids), shard_size)
+    ]
+
+
+def send_users_weather_forecast(
+        subscription_frequency: Frequency,
+        users_ids_range: tuple[int, int] | None = None
+) -> None:
     users = User.users.with_subscriptions_and_cities(subscription_frequency)
 
+    if users_ids_range is not None:
+        users = users.filter(pk__range=users_ids_range)
+
     if not users:
         return None
 
+    subscribed_cities = {
+        city.pk for user in users for city in user.city_subscriptions.all()
+    }
+    latest_forecasts = WeatherForecast.forecasts.latest_cities_forecasts(
+        subscribed_cities
+    )
+
+    messages = []
+
     for user in users:
         for city in user.city_subscriptions.all():
-            last_forecast = WeatherForecast.forecasts.latest_current_forecast(
-                city.country, city
-            )
+            last_forecast = latest_forecasts.get(city.pk)
+
+            if last_forecast is None:
+                continue
+
+            messages.append(_build_weather_forecast_mail(user, last_forecast))
 
-            _send_weather_forecast_mail(user, last_forecast)
+    _send_mails(messages, settings.MAIL_BATCH_SIZE)
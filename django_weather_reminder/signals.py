@@ -0,0 +1,56 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from django_weather_reminder.api.cache import (
+    invalidate_cities_geometry, invalidate_locations
+)
+from django_weather_reminder.models import City, Country, CurrentWeather
+
+
+@receiver(post_save, sender=CurrentWeather)
+def update_city_latest_forecast(sender, instance, created, **kwargs):
+    if created:
+        City.cities.update_latest_forecasts((instance.pk,))
+
+
+@receiver(post_save, sender=City)
+@receiver(post_delete, sender=City)
+@receiver(post_save, sender=Country)
+@receiver(post_delete, sender=Country)
+def invalidate_cached_locations(sender, **kwargs):
+    # After the commit, or a concurrent request could cache the old rows
+    # again under the new version.
+    transaction.on_commit(invalidate_locations)
+
+
+@receiver(post_delete, sender=City)
+def touch_city_country(sender, instance, **kwargs):
+    # A deleted city must move the Last-Modified of its country cities.
+    Country.countries.filter(pk=instance.country_id).update(
+        updated_at=timezone.now()
+    )
+
+
+@receiver(pre_save, sender=City)
+def check_city_moved(sender, instance, update_fields, **kwargs):
+    if instance._state.adding or (
+            update_fields is not None
+            and not {'lat', 'lon'} & set(update_fields)
+    ):
+        instance.moved = False
+
+        return None
+
+    stored_location = City.cities.filter(pk=instance.pk).values_list(
+        'lat', 'lon'
+    ).first()
+    instance.moved = stored_location != (instance.lat, instance.lon)
+
+
+@receiver(post_save, sender=City)
+@receiver(post_delete, sender=City)
+def invalidate_cities_geometry_on_change(sender, instance, **kwargs):
+    if kwargs.get('created', True) or instance.moved:
+        transaction.on_commit(invalidate_cities_geometry)
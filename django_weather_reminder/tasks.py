@@ -1,13 +1,132 @@
+import requests
+from celery import chord, group
+from celery.utils.log import get_task_logger
+from django.conf import settings
+
 from DjangoWeatherReminder.celery import app
 
 from django_weather_reminder import service
+from django_weather_reminder.weather_db.fillers import FillResult
+from django_weather_reminder.weather_db.partitions import ForecastPartitions
+from django_weather_reminder.weather_db.retention import ForecastRetention
+
+logger = get_task_logger(__name__)
 
 
 @app.task(priority=0)
 def fill_active_cities() -> None:
-    service.fill_weather_active_cities()
+    batches = service.split_active_cities_ids(
+        settings.WEATHER_FILL_TASK_BATCH_SIZE
+    )
+
+    if not batches:
+        return None
+
+    chord(
+        fill_cities_batch.s(cities_ids) for cities_ids in batches
+    )(record_filled_cities.s())
+
+
+@app.task(
+    priority=0, autoretry_for=(requests.RequestException,),
+    retry_backoff=True, max_retries=3
+)
+def fill_cities_batch(cities_ids: list[int]) -> dict:
+    return vars(service.fill_weather_cities(cities_ids))
+
+
+@app.task(priority=0)
+def record_filled_cities(batches_results: list[dict]) -> dict:
+    result = sum(
+        (FillResult(**batch_result) for batch_result in batches_results),
+        FillResult()
+    )
+
+    logger.info(
+        'The weather fill of %d batches: %d cities refreshed, '
+        '%d skipped as fresh, %d skipped as unchanged.',
+        len(batches_results), result.refreshed, result.skipped_fresh,
+        result.skipped_unchanged
+    )
+
+    return vars(result)
+
+
+@app.task(priority=5)
+def fill_active_cities_forecasts() -> None:
+    batches = service.split_active_cities_ids(
+        settings.WEATHER_FILL_TASK_BATCH_SIZE
+    )
+
+    if not batches:
+        return None
+
+    group(
+        fill_cities_forecasts_batch.s(cities_ids) for cities_ids in batches
+    ).apply_async()
+
+
+@app.task(
+    priority=5, autoretry_for=(requests.RequestException,),
+    retry_backoff=True, max_retries=3
+)
+def fill_cities_forecasts_batch(cities_ids: list[int]) -> int:
+    return service.fill_forecasts_cities(cities_ids)
 
 
 @app.task(priority=9)
 def send_mail_every_n_hours(n: int) -> None:
-    service.send_users_weather_forecast(n)
+    shards = service.split_subscribers_ids(n, settings.MAIL_SHARD_SIZE)
+
+    if not shards:
+        return None
+
+    group(
+        send_mail_to_users_shard.s(n, first_id, last_id)
+        for first_id, last_id in shards
+    ).apply_async()
+
+
+@app.task(priority=9)
+def send_mail_to_users_shard(n: int, first_id: int, last_id: int) -> None:
+    service.send_users_weather_forecast(n, (first_id, last_id))
+
+
+@app.task(priority=9)
+def apply_forecast_retention() -> dict:
+    retention = ForecastRetention(
+        settings.FORECAST_RETENTION_DAYS,
+        settings.FORECAST_RETENTION_CHUNK_SIZE
+    )
+    result = retention.apply()
+
+    logger.info(
+        'Forecasts retention: %d days summarized into %d summaries, '
+        '%d forecasts deleted, %d partitions dropped.',
+        result.expired_days, result.summaries_count, result.deleted_count,
+        result.dropped_partitions
+    )
+
+    return vars(result)
+
+
+@app.task(priority=9)
+def create_forecast_partitions() -> list[str]:
+    partitions = ForecastPartitions()
+
+    if not partitions.is_partitioned():
+        return []
+
+    created_months = [
+        f'{month:%Y-%m}'
+        for month in partitions.create_ahead(
+            settings.FORECAST_PARTITIONS_AHEAD
+        )
+    ]
+
+    logger.info(
+        'Forecast partitions created for the months: %s.',
+        ', '.join(created_months) or 'none'
+    )
+
+    return created_months
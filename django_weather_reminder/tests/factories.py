@@ -1,5 +1,5 @@
 import random
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
 import factory
 
@@ -23,8 +23,10 @@ class UserFactory(factory.django.DjangoModelFactory):
 
 
 class CountryFactory(factory.django.DjangoModelFactory):
-    name = factory.Faker('country')
-    code = factory.Faker('country_code')
+    # Unique, unlike the Faker countries, and the codes start with
+    # a digit, so they never clash with the real codes of a test.
+    name = factory.Sequence(lambda n: f'Country {n}')
+    code = factory.Sequence(lambda n: f'{n % 10}{chr(65 + n // 10 % 26)}')
 
     @classmethod
     def _create(cls, model_class, *args, **kwargs):
@@ -96,3 +98,59 @@ class CurrentWeatherFactory(factory.django.DjangoModelFactory):
 
     class Meta:
         model = models.CurrentWeather
+
+
+class HourlyForecastFactory(factory.django.DjangoModelFactory):
+    temp = random.uniform(-5, 5)
+    feels_like = temp + 1.2
+
+    pressure = random.randint(1, 1000)
+    humidity = random.randint(0, 100)
+    wind_speed = random.randint(0, 100)
+
+    weather_description = 'clouds is here'
+    weather_status = 'clouds'
+
+    date_time = factory.Sequence(
+        lambda n: datetime.now(tz=timezone.utc) + timedelta(hours=n)
+    )
+
+    city = factory.SubFactory(CityFactory)
+
+    @classmethod
+    def _create(cls, model_class, *args, **kwargs):
+        manager = cls._get_manager(model_class)
+
+        return manager.create(*args, **kwargs)
+
+    class Meta:
+        model = models.HourlyForecast
+
+
+class DailyForecastFactory(factory.django.DjangoModelFactory):
+    temp = random.uniform(-5, 5)
+    temp_min = temp - 3
+    temp_max = temp + 3
+    feels_like = temp + 1.2
+
+    pressure = random.randint(1, 1000)
+    humidity = random.randint(0, 100)
+    wind_speed = random.randint(0, 100)
+
+    weather_description = 'clouds is here'
+    weather_status = 'clouds'
+
+    date_time = factory.Sequence(
+        lambda n: datetime.now(tz=timezone.utc) + timedelta(days=n)
+    )
+
+    city = factory.SubFactory(CityFactory)
+
+    @classmethod
+    def _create(cls, model_class, *args, **kwargs):
+        manager = cls._get_manager(model_class)
+
+        return manager.create(*args, **kwargs)
+
+    class Meta:
+        model = models.DailyForecast
@@ -0,0 +1,96 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django_weather_reminder.openweathermap.parser import (
+    OpenWeatherMapParser, build_session
+)
+
+current_weather_json = {
+    'weather': [{'main': 'Clouds', 'description': 'overcast clouds'}],
+    'main': {
+        'temp': 0.02, 'feels_like': -2.81, 'pressure': 1012, 'humidity': 90
+    },
+    'wind': {'speed': 2.32},
+    'dt': 1645221843
+}
+
+
+class _OpenWeatherMapHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def setup(self) -> None:
+        super().setup()
+
+        with self.server.lock:
+            self.server.connections_count += 1
+
+    def do_GET(self) -> None:
+        with self.server.lock:
+            self.server.requests_count += 1
+
+            status = (
+                self.server.failing_statuses.pop(0)
+                if self.server.failing_statuses else 200
+            )
+
+        body = json.dumps(current_weather_json).encode()
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+class OpenWeatherMapStubServer(ThreadingHTTPServer):
+    """
+    Local stand-in for the OpenWeatherMap API, which answers every GET
+    request with the same current weather and counts opened connections.
+    Statuses put into failing_statuses are returned before the normal ones.
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), _OpenWeatherMapHandler)
+
+        self.lock = threading.Lock()
+        self.connections_count = 0
+        self.requests_count = 0
+        self.failing_statuses: list[int] = []
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address
+
+        return f'http://{host}:{port}'
+
+    def __enter__(self) -> 'OpenWeatherMapStubServer':
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class ConnectionPerRequestParser:
+    """
+    Wraps a parser to open a new connection for every request,
+    like a module-level requests.get call does.
+    """
+
+    def __init__(self, parser: OpenWeatherMapParser):
+        self._parser = parser
+
+    def parse_city_current_weather(self, lat: float, lon: float) -> dict:
+        with build_session(1, 0, 0) as session:
+            self._parser._session = session
+
+            return self._parser.parse_city_current_weather(lat, lon)
@@ -0,0 +1,261 @@
+import csv
+import gzip
+import io
+import os
+import tempfile
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta, timezone
+from unittest import mock, skipIf
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+
+from django_weather_reminder import models
+from django_weather_reminder.tests import factories
+from django_weather_reminder.weather_db.checkpoints import FillCheckpoint
+from django_weather_reminder.weather_db.exporters import pyarrow
+
+returned_json = {
+    'weather_status': 'Clouds', 'weather_description': 'overcast clouds',
+    'temp': 0.02, 'feels_like': -2.81, 'date_time': 1645221843,
+    'pressure': 1012, 'humidity': 90, 'wind_speed': 2.32
+}
+
+
+@mock.patch(
+    'django_weather_reminder.weather_db.fillers.CurrentWeather'
+    '._get_weather_data',
+    return_value=returned_json
+)
+class TestFillWeatherAllCities(TestCase):
+    def setUp(self) -> None:
+        self.test_country = factories.CountryFactory(
+            name='Ukraine', code='UA'
+        )
+        self.other_country = factories.CountryFactory(
+            name='Poland', code='PL'
+        )
+        self.country_cities = [
+            factories.CityFactory(country=self.test_country)
+            for _ in range(5)
+        ]
+        self.other_city = factories.CityFactory(country=self.other_country)
+
+        checkpoint_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(checkpoint_dir.cleanup)
+
+        self.checkpoint_path = os.path.join(checkpoint_dir.name, 'fill')
+
+    def _fill(self, country: str | None = 'ua', **options) -> None:
+        with redirect_stdout(io.StringIO()):
+            call_command(
+                'fill_weather_all_cities', country=country, chunk_size=2,
+                checkpoint=self.checkpoint_path, **options
+            )
+
+    def _filled_cities(self) -> set[models.City]:
+        return {
+            forecast.city
+            for forecast in models.CurrentWeather.forecasts.select_related(
+                'city'
+            )
+        }
+
+    def test_fill_with_limit(self, _) -> None:
+        self._fill(limit=3)
+
+        self.assertEqual(self._filled_cities(), set(self.country_cities[:3]))
+        self.assertEqual(
+            FillCheckpoint(self.checkpoint_path).load(),
+            {'last_pk': self.country_cities[2].pk, 'scope': {'country': 'UA'}}
+        )
+
+    def test_resume(self, _) -> None:
+        self._fill(limit=3)
+
+        # One chunk of the two cities left, streamed by a cursor.
+        with self.assertNumQueries(6):
+            self._fill(resume=True)
+
+        self.assertEqual(self._filled_cities(), set(self.country_cities))
+        self.assertEqual(models.CurrentWeather.forecasts.count(), 5)
+        self.assertIsNone(FillCheckpoint(self.checkpoint_path).load())
+
+    def test_resume_other_scope(self, _) -> None:
+        self._fill(limit=3)
+
+        with self.assertRaises(CommandError):
+            self._fill(resume=True, country=None)
+
+
+class TestDeleteCommands(TestCase):
+    def setUp(self) -> None:
+        self.test_country = factories.CountryFactory(
+            name='Ukraine', code='UA'
+        )
+        self.other_country = factories.CountryFactory(
+            name='Poland', code='PL'
+        )
+        self.country_cities = [
+            factories.CityFactory(country=self.test_country)
+            for _ in range(3)
+        ]
+        self.other_city = factories.CityFactory(country=self.other_country)
+
+        for city in self.country_cities + [self.other_city]:
+            factories.SubscriptionFactory(city=city)
+            factories.HourlyForecastFactory(city=city)
+
+            for days_ago in 10, 1:
+                factories.CurrentWeatherFactory(
+                    city=city,
+                    date_time=datetime.now(tz=timezone.utc)
+                    - timedelta(days=days_ago)
+                )
+
+    @staticmethod
+    def _call_command(*args, **options) -> str:
+        with redirect_stdout(io.StringIO()) as stdout:
+            call_command(*args, chunk_size=2, **options)
+
+        return stdout.getvalue()
+
+    def test_delete_forecasts_older_than(self) -> None:
+        output = self._call_command('delete_all_forecasts', older_than=5)
+
+        self.assertIn('Forecasts: 4 deleted', output)
+        self.assertFalse(
+            models.CurrentWeather.forecasts.filter(
+                date_time__lt=datetime.now(tz=timezone.utc) - timedelta(days=5)
+            ).exists()
+        )
+        self.assertEqual(models.CurrentWeather.forecasts.count(), 4)
+
+    def test_delete_all_forecasts(self) -> None:
+        self._call_command('delete_all_forecasts')
+
+        self.assertFalse(models.CurrentWeather.forecasts.exists())
+        self.assertFalse(
+            models.City.cities.filter(latest_forecast__isnull=False).exists()
+        )
+
+    def test_truncate_forecasts(self) -> None:
+        # TRUNCATE refuses to run with the deferred foreign key checks
+        # of the test transaction pending.
+        connection.check_constraints()
+
+        self._call_command('delete_all_forecasts', truncate=True)
+
+        self.assertFalse(models.CurrentWeather.forecasts.exists())
+        self.assertFalse(
+            models.City.cities.filter(latest_forecast__isnull=False).exists()
+        )
+
+    def test_delete_country_cities(self) -> None:
+        self._call_command('delete_cities', country='ua')
+
+        self.assertQuerysetEqual(models.City.cities.all(), [self.other_city])
+        self.assertQuerysetEqual(
+            models.Subscription.subscriptions.values_list('city', flat=True),
+            [self.other_city.pk]
+        )
+        self.assertEqual(
+            set(
+                models.CurrentWeather.forecasts.values_list('city', flat=True)
+            ),
+            {self.other_city.pk}
+        )
+        self.assertEqual(models.HourlyForecast.forecasts.count(), 1)
+
+    def test_delete_all_cities(self) -> None:
+        self._call_command('delete_cities')
+
+        self.assertFalse(models.City.cities.exists())
+        self.assertFalse(models.Subscription.subscriptions.exists())
+        self.assertFalse(models.CurrentWeather.forecasts.exists())
+
+
+class TestExportForecasts(TestCase):
+    def setUp(self) -> None:
+        self.test_country = factories.CountryFactory(
+            name='Ukraine', code='UA'
+        )
+        self.other_country = factories.CountryFactory(
+            name='Poland', code='PL'
+        )
+        self.test_city = factories.CityFactory(country=self.test_country)
+        self.other_city = factories.CityFactory(country=self.other_country)
+
+        self.now = datetime.now(tz=timezone.utc)
+        self.forecasts = [
+            factories.CurrentWeatherFactory(
+                city=city, date_time=self.now - timedelta(days=days_ago)
+            )
+            for days_ago in (3, 2, 1)
+            for city in (self.test_city, self.other_city)
+        ]
+
+        export_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(export_dir.cleanup)
+
+        self.export_path = export_dir.name
+
+    def _call_command(self, **options) -> list[list[str]]:
+        with redirect_stdout(io.StringIO()):
+            call_command(
+                'export_forecasts', self.export_path, rows_per_file=2,
+                chunk_size=1, **options
+            )
+
+        rows = []
+
+        for filename in sorted(os.listdir(self.export_path)):
+            path = os.path.join(self.export_path, filename)
+
+            with gzip.open(path, 'rt', encoding='utf-8', newline='') as file:
+                header, *file_rows = csv.reader(file)
+
+            self.assertLessEqual(len(file_rows), 2)
+            rows.extend(file_rows)
+
+        self.assertEqual(header[:4], ['id', 'city_id', 'city', 'country_code'])
+
+        return rows
+
+    def test_export(self) -> None:
+        rows = self._call_command()
+
+        self.assertEqual(len(os.listdir(self.export_path)), 3)
+        self.assertEqual(
+            [int(row[0]) for row in rows],
+            [forecast.pk for forecast in self.forecasts]
+        )
+
+    def test_export_filters(self) -> None:
+        since = (self.now - timedelta(days=2)).date()
+
+        rows = self._call_command(country='ua', since=since)
+
+        self.assertEqual(
+            [int(row[0]) for row in rows],
+            [self.forecasts[2].pk, self.forecasts[4].pk]
+        )
+        self.assertEqual({row[3] for row in rows}, {'UA'})
+
+    @skipIf(pyarrow is None, 'pyarrow is not installed')
+    def test_export_parquet(self) -> None:
+        with redirect_stdout(io.StringIO()):
+            call_command(
+                'export_forecasts', self.export_path, format='parquet',
+                cities=[self.other_city.pk]
+            )
+
+        table = pyarrow.parquet.read_table(
+            os.path.join(self.export_path, 'forecasts-0001.parquet')
+        )
+
+        self.assertEqual(
+            table.column('id').to_pylist(),
+            [forecast.pk for forecast in self.forecasts[1::2]]
+        )
@@ -0,0 +1,54 @@
+import random
+
+from django.test import SimpleTestCase
+
+from django_weather_reminder.weather_db.support import geo
+from django_weather_reminder.weather_db.support.kdtree import KDTree
+
+
+class TestKDTree(SimpleTestCase):
+    def setUp(self) -> None:
+        random.seed(18)
+
+        self.points = [
+            geo.to_unit_vector(
+                random.uniform(-90, 90), random.uniform(-180, 180)
+            )
+            for _ in range(1000)
+        ]
+        self.tree = KDTree(self.points, list(range(len(self.points))))
+
+    def _find_nearest_by_brute_force(
+            self, point: tuple, k: int
+    ) -> list[tuple[float, int]]:
+        distances = [
+            (sum((a - b) ** 2 for a, b in zip(point, other)), i)
+            for i, other in enumerate(self.points)
+        ]
+
+        return sorted(distances)[:k]
+
+    def test_nearest(self) -> None:
+        for _ in range(50):
+            point = geo.to_unit_vector(
+                random.uniform(-90, 90), random.uniform(-180, 180)
+            )
+
+            self.assertEqual(
+                self.tree.nearest(point, 7),
+                self._find_nearest_by_brute_force(point, 7)
+            )
+
+    def test_nearest_more_than_points(self) -> None:
+        tree = KDTree(self.points[:3], [0, 1, 2])
+
+        self.assertEqual(len(tree.nearest(self.points[0], 10)), 3)
+        self.assertEqual(KDTree([], []).nearest(self.points[0], 10), [])
+
+    def test_chord_to_km(self) -> None:
+        kyiv, lviv = geo.to_unit_vector(50.45, 30.52), geo.to_unit_vector(
+            49.84, 24.03
+        )
+        chord = sum((a - b) ** 2 for a, b in zip(kyiv, lviv)) ** 0.5
+
+        self.assertAlmostEqual(geo.chord_to_km(chord), 468, delta=2)
@@ -0,0 +1,182 @@
+import io
+import json
+import os
+import tempfile
+from contextlib import redirect_stdout
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+
+from django_weather_reminder import models
+from django_weather_reminder.tests import factories
+from django_weather_reminder.weather_db.importers import (
+    CitiesImporter, CityLocation, create_countries, read_json_locations,
+    read_locations
+)
+from django_weather_reminder.weather_db.support.json_stream import (
+    iter_json_array
+)
+
+locations_json = [
+    {'type': 'CITY', 'name': {'en': 'Kyiv'}, 'lat': 50.45, 'lng': 30.52},
+    {'type': 'STATE', 'name': {'en': 'Kyiv Oblast'}, 'lat': 50, 'lng': 30},
+    {'type': 'CITY', 'name': {'en': 'Lviv'}, 'lat': 49.84, 'lng': 24.03},
+    {'type': 'CITY', 'name': {'en': 'Nowhere'}, 'lat': None, 'lng': None},
+    {'type': 'CITY', 'name': {'en': 'Odesa'}, 'lat': 46.48, 'lng': 30.72},
+]
+
+
+def write_temp_file(test_case, suffix: str, content: str) -> str:
+    with tempfile.NamedTemporaryFile(
+            'w', suffix=suffix, delete=False, encoding='utf-8'
+    ) as file:
+        file.write(content)
+
+    test_case.addCleanup(os.remove, file.name)
+
+    return file.name
+
+
+class TestIterJsonArray(SimpleTestCase):
+    def test_items_across_reads(self) -> None:
+        items = locations_json + [12345, 'city', None, []]
+
+        for read_size in 1, 7, 1 << 16:
+            self.assertEqual(
+                list(
+                    iter_json_array(
+                        io.StringIO(json.dumps(items, indent=2)), read_size
+                    )
+                ),
+                items
+            )
+
+    def test_incomplete_array(self) -> None:
+        with self.assertRaises(ValueError):
+            list(iter_json_array(io.StringIO('[{"type": "CITY"}, 1'), 4))
+
+
+class TestCitiesImporter(TestCase):
+    def setUp(self) -> None:
+        self.test_country = factories.CountryFactory(code='UA')
+        self.importer = CitiesImporter(chunk_size=2, progress_every=2)
+
+        self.locations_path = write_temp_file(
+            self, '.json', json.dumps(locations_json)
+        )
+
+    def test_import_json_locations(self) -> None:
+        result = self.importer.import_cities(
+            read_json_locations(self.locations_path, 'UA')
+        )
+
+        self.assertEqual(result.processed, 3)
+        self.assertEqual(result.imported, 3)
+        self.assertEqual(
+            set(
+                models.City.cities.filter(
+                    country=self.test_country
+                ).values_list('name', 'lat', 'lon')
+            ),
+            {('Kyiv', 50.45, 30.52), ('Lviv', 49.84, 24.03),
+             ('Odesa', 46.48, 30.72)}
+        )
+
+    def test_import_twice(self) -> None:
+        self.importer.import_cities(
+            read_json_locations(self.locations_path, 'UA')
+        )
+
+        # Two chunks upserts within a savepoint.
+        with self.assertNumQueries(4):
+            result = self.importer.import_cities(
+                read_json_locations(self.locations_path, 'UA')
+            )
+
+        self.assertEqual(result.imported, 0)
+        self.assertEqual(models.City.cities.count(), 3)
+
+    def test_import_keeps_active_cities(self) -> None:
+        kyiv = factories.CityFactory(
+            name='Kyiv', lat=50.45, lon=30.52, country=self.test_country,
+            active=True
+        )
+
+        result = self.importer.import_cities(
+            [CityLocation('Kyiv', 50.45, 30.52, 'UA')]
+        )
+
+        kyiv.refresh_from_db()
+
+        self.assertEqual(result.imported, 0)
+        self.assertTrue(kyiv.active)
+
+    def test_import_created_countries(self) -> None:
+        create_countries(('UA', 'PL', 'CZ'), {'PL': 'Poland'})
+
+        result = self.importer.import_cities(
+            [
+                CityLocation('Krakow', 50.06, 19.94, 'PL'),
+                CityLocation('Brno', 49.2, 16.61, 'CZ'),
+                CityLocation('Lviv', 49.84, 24.03, 'UA')
+            ]
+        )
+
+        self.assertEqual(result.imported, 3)
+        self.assertEqual(
+            dict(models.Country.countries.values_list('code', 'name')),
+            {'UA': self.test_country.name, 'PL': 'Poland', 'CZ': 'CZ'}
+        )
+
+    def test_import_missing_country(self) -> None:
+        with self.assertRaises(ValueError):
+            self.importer.import_cities(
+                [CityLocation('Krakow', 50.06, 19.94, 'PL')]
+            )
+
+        self.assertFalse(models.Country.countries.filter(code='PL').exists())
+
+    def test_read_csv_and_geonames_locations(self) -> None:
+        csv_path = write_temp_file(
+            self, '.csv',
+            'name,lat,lon,country_code\nKrakow,50.06,19.94,PL\n'
+            'Lviv,49.84,24.03,\n'
+        )
+        geonames_path = write_temp_file(
+            self, '.txt',
+            '703448\tKyiv\tKyiv\tKiev\t50.45466\t30.5238\tP\tPPLC\tUA\n'
+            '703447\tKyiv Oblast\tKyiv\t\t50.3\t30.5\tA\tADM1\tUA\n'
+        )
+
+        self.assertEqual(
+            list(read_locations(csv_path, 'UA')),
+            [
+                CityLocation('Krakow', 50.06, 19.94, 'PL'),
+                CityLocation('Lviv', 49.84, 24.03, 'UA')
+            ]
+        )
+        self.assertEqual(
+            list(read_locations(geonames_path)),
+            [CityLocation('Kyiv', 50.45466, 30.5238, 'UA')]
+        )
+
+
+class TestImportLocationsCommand(TransactionTestCase):
+    def test_import_files_in_workers(self) -> None:
+        json_path = write_temp_file(self, '.json', json.dumps(locations_json))
+        csv_path = write_temp_file(
+            self, '.csv', 'name,lat,lon,country_code\nBrno,49.2,16.61,CZ\n'
+        )
+
+        with redirect_stdout(io.StringIO()) as stdout:
+            call_command(
+                'import_locations', json_path, csv_path, country='UA',
+                country_name='Ukraine', workers=2
+            )
+
+        self.assertIn('Processed 4 cities, imported 4 new.', stdout.getvalue())
+        self.assertEqual(
+            dict(models.Country.countries.values_list('code', 'name')),
+            {'UA': 'Ukraine', 'CZ': 'CZ'}
+        )
+        self.assertEqual(models.City.cities.count(), 4)
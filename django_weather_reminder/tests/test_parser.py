@@ -0,0 +1,66 @@
+import requests
+from django.test import SimpleTestCase
+
+from django_weather_reminder.openweathermap.parser import (
+    OpenWeatherMapParser, build_session
+)
+from django_weather_reminder.tests.stub_server import (
+    ConnectionPerRequestParser, OpenWeatherMapStubServer
+)
+
+
+class TestOpenWeatherMapParser(SimpleTestCase):
+    cities_count = 20
+
+    def setUp(self) -> None:
+        self.server = OpenWeatherMapStubServer().__enter__()
+
+    def tearDown(self) -> None:
+        self.server.__exit__()
+
+    def _build_parser(self) -> OpenWeatherMapParser:
+        return OpenWeatherMapParser(
+            'test_key', session=build_session(1, 3, 0),
+            base_url=self.server.base_url, timeout=(1, 1)
+        )
+
+    def _parse_cities(self, parser: OpenWeatherMapParser) -> None:
+        for i in range(self.cities_count):
+            parser.parse_city_current_weather(i, i)
+
+    def test_session_reuses_connection(self) -> None:
+        self._parse_cities(self._build_parser())
+
+        self.assertEqual(self.server.connections_count, 1)
+        self.assertEqual(self.server.requests_count, self.cities_count)
+
+    def test_connection_per_request_without_session_reuse(self) -> None:
+        self._parse_cities(ConnectionPerRequestParser(self._build_parser()))
+
+        self.assertEqual(self.server.connections_count, self.cities_count)
+
+    def test_parse_city_current_weather(self) -> None:
+        expected_forecast = {
+            'weather_status': 'Clouds',
+            'weather_description': 'overcast clouds',
+            'temp': 0.02, 'feels_like': -2.81, 'date_time': 1645221843,
+            'pressure': 1012, 'humidity': 90, 'wind_speed': 2.32
+        }
+
+        forecast = self._build_parser().parse_city_current_weather(1, 1)
+
+        self.assertEqual(forecast, expected_forecast)
+
+    def test_retry_on_server_errors(self) -> None:
+        self.server.failing_statuses = [429, 503]
+
+        forecast = self._build_parser().parse_city_current_weather(1, 1)
+
+        self.assertEqual(forecast['weather_status'], 'Clouds')
+        self.assertEqual(self.server.requests_count, 3)
+
+    def test_retries_exhausted(self) -> None:
+        self.server.failing_statuses = [500] * 5
+
+        with self.assertRaises(requests.RequestException):
+            self._build_parser().parse_city_current_weather(1, 1)
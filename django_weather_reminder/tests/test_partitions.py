@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta, timezone
+
+from django.db import connection
+from django.test import TestCase
+
+from django_weather_reminder import models
+from django_weather_reminder.tests import factories
+from django_weather_reminder.weather_db.partitions import (
+    ForecastPartitions, add_months, month_bounds
+)
+from django_weather_reminder.weather_db.retention import ForecastRetention
+
+
+class TestForecastPartitions(TestCase):
+    def setUp(self) -> None:
+        self.test_city = factories.CityFactory(active=True)
+        self.current_month = datetime.now(tz=timezone.utc).date().replace(
+            day=1
+        )
+        self.old_month = add_months(self.current_month, -3)
+
+        self.old_forecasts = [
+            factories.CurrentWeatherFactory(
+                city=self.test_city,
+                date_time=month_bounds(self.old_month)[0] + timedelta(hours=i)
+            )
+            for i in range(3)
+        ]
+        self.current_forecast = factories.CurrentWeatherFactory(
+            city=self.test_city,
+            date_time=datetime.now(tz=timezone.utc) - timedelta(hours=1)
+        )
+
+        # The deferred foreign key checks of the created forecasts
+        # would forbid altering their table in the same transaction.
+        connection.check_constraints()
+
+        self.partitions = ForecastPartitions()
+
+    def _count_rows(self, table: str) -> int:
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM {table}')
+
+            return cursor.fetchone()[0]
+
+    def test_convert(self) -> None:
+        self.assertFalse(self.partitions.is_partitioned())
+
+        months = self.partitions.convert(months_ahead=1)
+
+        self.assertTrue(self.partitions.is_partitioned())
+        self.assertEqual(
+            months, [add_months(self.old_month, i) for i in range(5)]
+        )
+        self.assertEqual(models.CurrentWeather.forecasts.count(), 4)
+        self.assertEqual(
+            self._count_rows(self.partitions.default_partition), 0
+        )
+
+        new_forecast = factories.CurrentWeatherFactory(
+            city=self.test_city, date_time=datetime.now(tz=timezone.utc)
+        )
+
+        self.assertGreater(new_forecast.pk, self.current_forecast.pk)
+
+    def test_create_ahead(self) -> None:
+        self.partitions.convert(months_ahead=0)
+
+        next_month = add_months(self.current_month, 1)
+        future_forecast = factories.CurrentWeatherFactory(
+            city=self.test_city, date_time=month_bounds(next_month)[0]
+        )
+
+        self.assertEqual(
+            self._count_rows(self.partitions.default_partition), 1
+        )
+
+        created_months = self.partitions.create_ahead(months_ahead=2)
+
+        self.assertEqual(
+            created_months, [next_month, add_months(self.current_month, 2)]
+        )
+        self.assertEqual(
+            self._count_rows(self.partitions.default_partition), 0
+        )
+        self.assertEqual(
+            models.CurrentWeather.forecasts.get(pk=future_forecast.pk),
+            future_forecast
+        )
+        self.assertEqual(self.partitions.create_ahead(months_ahead=2), [])
+
+    def test_retention_drops_expired_partitions(self) -> None:
+        inactive_city = factories.CityFactory()
+        latest_forecast = factories.CurrentWeatherFactory(
+            city=inactive_city, date_time=self.old_forecasts[0].date_time
+        )
+        connection.check_constraints()
+
+        self.partitions.convert(months_ahead=0)
+
+        result = ForecastRetention(keep_days=2, chunk_size=2).apply()
+
+        inactive_city.refresh_from_db()
+
+        self.assertGreaterEqual(result.dropped_partitions, 2)
+        self.assertEqual(result.deleted_count, 0)
+        self.assertNotIn(self.old_month, self.partitions.get_months())
+        self.assertTrue(
+            models.DailyWeather.summaries.filter(
+                city=self.test_city, date=self.old_month
+            ).exists()
+        )
+        self.assertQuerysetEqual(
+            models.CurrentWeather.forecasts.order_by('pk'),
+            [self.current_forecast, latest_forecast]
+        )
+        self.assertEqual(inactive_city.latest_forecast, latest_forecast)
+        self.assertEqual(
+            self._count_rows(self.partitions.default_partition), 1
+        )
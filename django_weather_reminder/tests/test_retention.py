@@ -0,0 +1,98 @@
+from datetime import datetime, time, timedelta, timezone
+
+from django.test import TestCase
+
+from django_weather_reminder import models
+from django_weather_reminder.tests import factories
+from django_weather_reminder.weather_db.retention import ForecastRetention
+
+
+class TestForecastRetention(TestCase):
+    keep_days = 2
+
+    def setUp(self) -> None:
+        self.test_city = factories.CityFactory(active=True)
+
+        today = datetime.now(tz=timezone.utc).date()
+        self.expired_day = today - timedelta(days=self.keep_days + 1)
+        expired_day_start = datetime.combine(
+            self.expired_day, time.min, tzinfo=timezone.utc
+        )
+
+        self.expired_forecasts = [
+            factories.CurrentWeatherFactory(
+                city=self.test_city, temp=temp, weather_status=status,
+                date_time=expired_day_start + timedelta(hours=hour)
+            )
+            for hour, (temp, status) in enumerate(
+                ((-2, 'Clouds'), (4, 'Rain'), (1, 'Clouds'))
+            )
+        ]
+        self.kept_forecast = factories.CurrentWeatherFactory(
+            city=self.test_city,
+            date_time=datetime.now(tz=timezone.utc) - timedelta(hours=1)
+        )
+
+        self.retention = ForecastRetention(self.keep_days, chunk_size=2)
+
+    def test_apply(self) -> None:
+        result = self.retention.apply()
+
+        summary = models.DailyWeather.summaries.get(city=self.test_city)
+
+        self.assertEqual(summary.date, self.expired_day)
+        self.assertEqual(summary.temp_min, -2)
+        self.assertEqual(summary.temp_max, 4)
+        self.assertEqual(summary.temp_mean, 1)
+        self.assertEqual(summary.weather_status, 'Clouds')
+        self.assertEqual(summary.samples_count, 3)
+
+        self.assertEqual(result.summaries_count, 1)
+        self.assertEqual(result.deleted_count, 3)
+        self.assertQuerysetEqual(
+            models.CurrentWeather.forecasts.all(), [self.kept_forecast]
+        )
+
+    def test_apply_keeps_latest_forecast(self) -> None:
+        inactive_city = factories.CityFactory()
+        latest_forecast = factories.CurrentWeatherFactory(
+            city=inactive_city, date_time=self.expired_forecasts[0].date_time
+        )
+
+        result = self.retention.apply()
+
+        inactive_city.refresh_from_db()
+
+        self.assertEqual(result.summaries_count, 2)
+        self.assertEqual(result.deleted_count, 3)
+        self.assertEqual(inactive_city.latest_forecast, latest_forecast)
+
+    def test_apply_twice(self) -> None:
+        self.retention.apply()
+        result = self.retention.apply()
+
+        self.assertEqual(result.summaries_count, 0)
+        self.assertEqual(result.deleted_count, 0)
+        self.assertEqual(models.DailyWeather.summaries.count(), 1)
+
+    def test_apply_skips_summarized_days(self) -> None:
+        inactive_city = factories.CityFactory()
+        factories.CurrentWeatherFactory(
+            city=inactive_city,
+            date_time=self.expired_forecasts[0].date_time - timedelta(days=90)
+        )
+
+        first_result = self.retention.apply()
+        second_result = self.retention.apply()
+
+        self.assertGreaterEqual(first_result.expired_days, 90)
+        self.assertEqual(second_result.expired_days, 0)
+        self.assertEqual(second_result.summaries_count, 0)
+
+    def test_estimate(self) -> None:
+        result = self.retention.estimate()
+
+        self.assertEqual(result.deleted_count, 3)
+        self.assertGreaterEqual(result.expired_days, 1)
+        self.assertEqual(models.CurrentWeather.forecasts.count(), 4)
+        self.assertFalse(models.DailyWeather.summaries.exists())
@@ -1,12 +1,18 @@
+import threading
+import time
 from unittest import mock
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.core import mail
+from django.core.mail.backends import locmem
+from django.db import connection
 
 from django_weather_reminder.service import (
-    fill_weather_active_cities, _send_weather_forecast_mail,
-    datetime_to_readable_format, send_users_weather_forecast
+    fill_weather_cities, _build_weather_forecast_mail, _send_mails,
+    datetime_to_readable_format, send_users_weather_forecast,
+    fill_forecasts_cities
 )
 from django_weather_reminder.tests import factories
 from django_weather_reminder import models
@@ -18,6 +24,40 @@ returned_json = {
 }
 
 
+def build_forecasts_json(temp: float, now: int) -> dict:
+    forecast_json = {
+        'weather_status': 'Clouds', 'weather_description': 'overcast clouds',
+        'pressure': 1012, 'humidity': 90, 'wind_speed': 2.32
+    }
+
+    return {
+        'hourly_forecasts': [
+            forecast_json | {
+                'temp': temp, 'feels_like': temp,
+                'date_time': now + hour * 3600
+            }
+            for hour in range(48)
+        ],
+        'daily_forecasts': [
+            forecast_json | {
+                'temp': {'day': temp, 'min': temp - 3, 'max': temp + 3},
+                'feels_like': {'day': temp},
+                'date_time': now + day * 86400
+            }
+            for day in range(8)
+        ]
+    }
+
+
+class CountingEmailBackend(locmem.EmailBackend):
+    opened_connections = 0
+
+    def open(self):
+        CountingEmailBackend.opened_connections += 1
+
+        return super().open()
+
+
 class TestService(TestCase):
     def setUp(self) -> None:
         self.country = factories.CountryFactory()
@@ -26,13 +66,14 @@ class TestService(TestCase):
             factories.CityFactory(active=True, country=self.country)
             for _ in range(5)
         ]
+        self.active_cities_ids = [city.pk for city in self.active_cities]
 
     @mock.patch(
         'django_weather_reminder.service.CurrentWeather._get_weather_data',
         return_value=returned_json
     )
-    def test_fill_weather_active_cities(self, get_weather) -> None:
-        fill_weather_active_cities()
+    def test_fill_weather_cities(self, get_weather) -> None:
+        fill_weather_cities(self.active_cities_ids)
 
         forecasts_count = models.CurrentWeather.forecasts.all().count()
 
@@ -48,13 +89,191 @@ class TestService(TestCase):
 
         self.assertEqual(forecasts_count, len(self.active_cities))
 
+    @override_settings(WEATHER_FILL_CONCURRENCY=2)
+    def test_fill_weather_cities_concurrency_limit(self) -> None:
+        lock = threading.Lock()
+        running, max_running = 0, 0
+
+        def get_weather_data(city):
+            nonlocal running, max_running
+
+            with lock:
+                running += 1
+                max_running = max(max_running, running)
+
+            time.sleep(0.05)
+
+            with lock:
+                running -= 1
+
+            return returned_json
+
+        with mock.patch(
+            'django_weather_reminder.service.CurrentWeather._get_weather_data',
+            side_effect=get_weather_data
+        ):
+            fill_weather_cities(self.active_cities_ids)
+
+        self.assertEqual(max_running, 2)
+        self.assertEqual(
+            models.CurrentWeather.forecasts.count(), len(self.active_cities)
+        )
+
+    @override_settings(WEATHER_FILL_BATCH_SIZE=2)
+    @mock.patch(
+        'django_weather_reminder.service.CurrentWeather._get_weather_data',
+        return_value=returned_json
+    )
+    def test_fill_weather_cities_in_batches(self, get_weather) -> None:
+        with CaptureQueriesContext(connection) as queries:
+            fill_weather_cities(self.active_cities_ids)
+
+        inserts = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('INSERT')
+        ]
+
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(
+            models.CurrentWeather.forecasts.count(), len(self.active_cities)
+        )
+
+    @mock.patch(
+        'django_weather_reminder.service.CurrentWeather._get_weather_data',
+        return_value=returned_json
+    )
+    def test_fill_weather_updates_latest_forecast(self, get_weather) -> None:
+        fill_weather_cities(self.active_cities_ids)
+
+        test_city = self.active_cities[0]
+        test_city.refresh_from_db()
+        filled_forecast = test_city.latest_forecast
+
+        factories.CurrentWeatherFactory(
+            city=test_city,
+            date_time=filled_forecast.date_time - timedelta(hours=1)
+        )
+
+        with self.assertNumQueries(1):
+            latest_forecast = (
+                models.CurrentWeather.forecasts.latest_current_forecast(
+                    self.country, test_city
+                )
+            )
+
+        self.assertEqual(latest_forecast, filled_forecast)
+        self.assertEqual(latest_forecast.temp, returned_json['temp'])
+
+    def test_city_save_keeps_latest_forecast(self) -> None:
+        test_city = models.City.cities.get(pk=self.active_cities[0].pk)
+        forecast = factories.CurrentWeatherFactory(city=test_city)
+
+        test_city.name = '_renamed'
+        test_city.save()
+        test_city.refresh_from_db()
+
+        self.assertEqual(test_city.name, '_renamed')
+        self.assertEqual(test_city.latest_forecast, forecast)
+
+    @override_settings(WEATHER_FILL_GRID_PRECISION=0.1)
+    @mock.patch(
+        'django_weather_reminder.service.CurrentWeather._get_weather_data',
+        return_value=returned_json
+    )
+    def test_fill_weather_cities_by_grid(self, get_weather) -> None:
+        coordinates = (
+            (50.41, 30.51), (50.43, 30.57), (50.49, 30.52),
+            (46.47, 30.73), (46.48, 30.74)
+        )
+
+        for city, (lat, lon) in zip(self.active_cities, coordinates):
+            city.lat, city.lon = lat, lon
+            city.save()
+
+        fill_weather_cities(self.active_cities_ids)
+
+        self.assertEqual(get_weather.call_count, 2)
+        self.assertEqual(
+            models.CurrentWeather.forecasts.count(), len(self.active_cities)
+        )
+
+    @mock.patch(
+        'django_weather_reminder.service.CurrentWeather._get_weather_data',
+        return_value=returned_json
+    )
+    def test_fill_weather_skips_unchanged(self, get_weather) -> None:
+        first_result = fill_weather_cities(self.active_cities_ids)
+        second_result = fill_weather_cities(self.active_cities_ids)
+
+        self.assertEqual(first_result.refreshed, len(self.active_cities))
+        self.assertEqual(second_result.refreshed, 0)
+        self.assertEqual(
+            second_result.skipped_unchanged, len(self.active_cities)
+        )
+        self.assertEqual(
+            models.CurrentWeather.forecasts.count(), len(self.active_cities)
+        )
+
+    @override_settings(WEATHER_FILL_FRESH_TTL_MINUTES=30)
+    @mock.patch(
+        'django_weather_reminder.service.CurrentWeather._get_weather_data',
+        return_value=returned_json
+    )
+    def test_fill_weather_skips_fresh(self, get_weather) -> None:
+        factories.CurrentWeatherFactory(
+            city=self.active_cities[0],
+            date_time=datetime.now(tz=timezone.utc) - timedelta(minutes=10)
+        )
+
+        result = fill_weather_cities(self.active_cities_ids)
+
+        self.assertEqual(result.skipped_fresh, 1)
+        self.assertEqual(result.refreshed, len(self.active_cities) - 1)
+        self.assertEqual(get_weather.call_count, len(self.active_cities) - 1)
+
+    @override_settings(WEATHER_FILL_BATCH_SIZE=100)
+    def test_fill_forecasts_cities(self) -> None:
+        cities_ids = [city.pk for city in self.active_cities]
+        # Both fills return the same hours, as a real API within one hour.
+        now = int(datetime.now(tz=timezone.utc).timestamp())
+
+        with mock.patch(
+            'django_weather_reminder.service.CityForecasts._get_weather_data',
+            return_value=build_forecasts_json(1.5, now)
+        ):
+            fill_forecasts_cities(cities_ids)
+
+        with mock.patch(
+            'django_weather_reminder.service.CityForecasts._get_weather_data',
+            return_value=build_forecasts_json(3.5, now)
+        ), CaptureQueriesContext(connection) as queries:
+            filled_count = fill_forecasts_cities(cities_ids)
+
+        inserts = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('INSERT')
+        ]
+
+        self.assertEqual(filled_count, len(self.active_cities))
+        self.assertEqual(len(inserts), 6)
+        self.assertEqual(
+            models.HourlyForecast.forecasts.count(),
+            48 * len(self.active_cities)
+        )
+        self.assertEqual(
+            set(models.DailyForecast.forecasts.values_list(
+                'temp_max', flat=True
+            )),
+            {6.5}
+        )
+
     def test_send_weather_forecast_mail(self):
         test_city = self.active_cities[0]
         test_forecast = factories.CurrentWeatherFactory(city=test_city)
         test_user = factories.UserFactory(email='test@test.com')
 
-        _send_weather_forecast_mail(
-            test_user, test_forecast
+        _send_mails(
+            [_build_weather_forecast_mail(test_user, test_forecast)], 1
         )
 
         expected_subject = f'Weather in {test_forecast.city.name}'
@@ -90,7 +309,10 @@ class TestService(TestCase):
             user=test_user, city=city, frequency=frequency
         )
 
-    @mock.patch('django_weather_reminder.service._send_weather_forecast_mail')
+    @mock.patch(
+        'django_weather_reminder.service._build_weather_forecast_mail',
+        wraps=_build_weather_forecast_mail
+    )
     def test_send_users_weather_forecast(self, send_mail):
         test_city = factories.CityFactory()
 
@@ -111,3 +333,69 @@ class TestService(TestCase):
 
         send_users_weather_forecast(3)
         send_mail.assert_called_with(test_users[1], test_forecasts[1])
+
+    @mock.patch(
+        'django_weather_reminder.service._build_weather_forecast_mail',
+        wraps=_build_weather_forecast_mail
+    )
+    def test_send_users_weather_forecast_query_count(self, send_mail):
+        for city in self.active_cities:
+            factories.CurrentWeatherFactory(city=city)
+
+        for _ in range(3):
+            test_user = factories.UserFactory()
+
+            for city in self.active_cities[:3]:
+                self._create_subscription(test_user, city, 1)
+
+        with self.assertNumQueries(5):
+            send_users_weather_forecast(1)
+
+        self.assertEqual(send_mail.call_count, 9)
+
+    @mock.patch(
+        'django_weather_reminder.service._build_weather_forecast_mail',
+        wraps=_build_weather_forecast_mail
+    )
+    def test_send_users_weather_forecast_without_forecast(self, send_mail):
+        self._create_subscription(
+            factories.UserFactory(), self.active_cities[0], 1
+        )
+
+        send_users_weather_forecast(1)
+
+        send_mail.assert_not_called()
+
+    @override_settings(
+        EMAIL_BACKEND=(
+            'django_weather_reminder.tests.test_service.CountingEmailBackend'
+        ),
+        MAIL_BATCH_SIZE=2
+    )
+    def test_send_users_weather_forecast_reuses_connection(self):
+        CountingEmailBackend.opened_connections = 0
+
+        for city in self.active_cities:
+            factories.CurrentWeatherFactory(city=city)
+            self._create_subscription(factories.UserFactory(), city, 1)
+
+        send_users_weather_forecast(1)
+
+        self.assertEqual(len(mail.outbox), len(self.active_cities))
+        self.assertEqual(CountingEmailBackend.opened_connections, 3)
+
+    @mock.patch(
+        'django_weather_reminder.service._build_weather_forecast_mail',
+        wraps=_build_weather_forecast_mail
+    )
+    def test_send_users_weather_forecast_in_users_range(self, send_mail):
+        test_city = self.active_cities[0]
+        test_forecast = factories.CurrentWeatherFactory(city=test_city)
+        test_users = [factories.UserFactory() for _ in range(3)]
+
+        for test_user in test_users:
+            self._create_subscription(test_user, test_city, 1)
+
+        send_users_weather_forecast(1, (test_users[1].pk, test_users[1].pk))
+
+        send_mail.assert_called_once_with(test_users[1], test_forecast)
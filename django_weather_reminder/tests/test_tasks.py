@@ -1,9 +1,15 @@
 from unittest import mock
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
+from DjangoWeatherReminder.celery import app
+from django_weather_reminder import models, service
 from django_weather_reminder.tests import factories
-from django_weather_reminder.tasks import send_mail_every_n_hours
+from django_weather_reminder.tests.test_service import returned_json
+from django_weather_reminder.weather_db.fillers import FillResult
+from django_weather_reminder.tasks import (
+    fill_active_cities, record_filled_cities, send_mail_every_n_hours
+)
 
 
 class TestTasks(TestCase):
@@ -15,10 +21,130 @@ class TestTasks(TestCase):
             for _ in range(5)
         ]
 
+        app.conf.task_always_eager = True
+        self.addCleanup(setattr, app.conf, 'task_always_eager', False)
+
+    @override_settings(MAIL_SHARD_SIZE=2)
     @mock.patch(
         'django_weather_reminder.tasks.service.send_users_weather_forecast'
     )
     def test_send_users_weather_forecast_success(self, send_mail) -> None:
+        test_users = [
+            factories.UserFactory() for _ in range(len(self.active_cities))
+        ]
+
+        for test_user, city in zip(test_users, self.active_cities):
+            factories.SubscriptionFactory(
+                user=test_user, city=city, frequency=3
+            )
+
+        send_mail_every_n_hours(3)
+
+        first_id, last_id = test_users[0].pk, test_users[-1].pk
+        expected_calls = [
+            mock.call(3, (shard_first_id, min(shard_first_id + 1, last_id)))
+            for shard_first_id in range(first_id, last_id + 1, 2)
+        ]
+
+        send_mail.assert_has_calls(expected_calls, any_order=True)
+        self.assertEqual(send_mail.call_count, len(expected_calls))
+
+    @override_settings(MAIL_SHARD_SIZE=2)
+    @mock.patch(
+        'django_weather_reminder.tasks.service.send_users_weather_forecast'
+    )
+    def test_send_users_weather_forecast_sparse_ids(self, send_mail) -> None:
+        test_users = [factories.UserFactory() for _ in range(12)]
+
+        for test_user in test_users[1:10]:
+            test_user.delete()
+
+        subscribers = test_users[:1] + test_users[10:]
+
+        for test_user in subscribers:
+            factories.SubscriptionFactory(
+                user=test_user, city=self.active_cities[0], frequency=3
+            )
+
         send_mail_every_n_hours(3)
 
-        send_mail.assert_called_with(3)
+        self.assertEqual(
+            send_mail.call_args_list,
+            [
+                mock.call(3, (subscribers[0].pk, subscribers[1].pk)),
+                mock.call(3, (subscribers[2].pk, subscribers[2].pk))
+            ]
+        )
+
+    @mock.patch(
+        'django_weather_reminder.tasks.service.send_users_weather_forecast'
+    )
+    def test_send_users_weather_forecast_without_subscribers(
+            self, send_mail
+    ) -> None:
+        send_mail_every_n_hours(3)
+
+        send_mail.assert_not_called()
+
+    @override_settings(WEATHER_FILL_TASK_BATCH_SIZE=2)
+    @mock.patch(
+        'django_weather_reminder.tasks.service.fill_weather_cities',
+        side_effect=lambda cities_ids: FillResult(refreshed=len(cities_ids))
+    )
+    def test_fill_active_cities_in_batches(self, fill_weather) -> None:
+        factories.CityFactory(country=self.country)
+
+        fill_active_cities()
+
+        filled_ids = [
+            city_id
+            for call in fill_weather.call_args_list for city_id in call.args[0]
+        ]
+
+        self.assertEqual(fill_weather.call_count, 3)
+        self.assertCountEqual(
+            filled_ids, [city.pk for city in self.active_cities]
+        )
+
+    @override_settings(
+        WEATHER_FILL_TASK_BATCH_SIZE=2, WEATHER_FILL_GRID_PRECISION=0.1
+    )
+    @mock.patch(
+        'django_weather_reminder.service.CurrentWeather._get_weather_data',
+        return_value=returned_json
+    )
+    def test_fill_active_cities_batches_by_grid(self, get_weather) -> None:
+        # Cities of the two cells alternate in primary key order.
+        coordinates = (
+            (50.41, 30.51), (46.47, 30.73), (50.43, 30.57),
+            (46.48, 30.74), (50.49, 30.52)
+        )
+
+        for city, (lat, lon) in zip(self.active_cities, coordinates):
+            city.lat, city.lon = lat, lon
+            city.save()
+
+        with mock.patch(
+            'django_weather_reminder.tasks.service.fill_weather_cities',
+            wraps=service.fill_weather_cities
+        ) as fill_weather:
+            fill_active_cities()
+
+        self.assertEqual(
+            [len(call.args[0]) for call in fill_weather.call_args_list],
+            [2, 3]
+        )
+        self.assertEqual(get_weather.call_count, 2)
+        self.assertEqual(
+            models.CurrentWeather.forecasts.count(), len(self.active_cities)
+        )
+
+    def test_record_filled_cities(self) -> None:
+        batches_results = [
+            vars(FillResult(2, 0, 0)), vars(FillResult(1, 1, 0)),
+            vars(FillResult(0, 0, 2))
+        ]
+
+        self.assertEqual(
+            record_filled_cities(batches_results), vars(FillResult(3, 1, 2))
+        )
@@ -0,0 +1,34 @@
+import json
+import os
+
+
+class FillCheckpoint:
+    """
+    Last city processed by a fill run, with the scope of the run,
+    stored in a file so an interrupted run can be resumed.
+    """
+
+    def __init__(self, filepath: str):
+        self._filepath = filepath
+
+    def load(self) -> dict | None:
+        try:
+            with open(self._filepath, encoding='utf-8') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+
+    def save(self, last_pk: int, scope: dict) -> None:
+        # Replaced at once, so a crash never leaves a half written file.
+        temp_filepath = f'{self._filepath}.tmp'
+
+        with open(temp_filepath, 'w', encoding='utf-8') as file:
+            json.dump({'last_pk': last_pk, 'scope': scope}, file)
+
+        os.replace(temp_filepath, self._filepath)
+
+    def clear(self) -> None:
+        try:
+            os.remove(self._filepath)
+        except FileNotFoundError:
+            pass
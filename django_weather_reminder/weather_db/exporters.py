@@ -0,0 +1,158 @@
+import csv
+import gzip
+import os
+from dataclasses import dataclass, field
+from itertools import islice
+
+from django.db.models import QuerySet
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# Exported fields of a forecast and the names of their columns.
+EXPORT_FIELDS = {
+    'id': 'id',
+    'city_id': 'city_id',
+    'city__name': 'city',
+    'city__country__code': 'country_code',
+    'date_time': 'date_time',
+    'temp': 'temp',
+    'feels_like': 'feels_like',
+    'pressure': 'pressure',
+    'humidity': 'humidity',
+    'wind_speed': 'wind_speed',
+    'weather_status': 'weather_status',
+    'weather_description': 'weather_description',
+}
+
+
+@dataclass
+class ExportResult:
+    rows_count: int = 0
+    paths: list[str] = field(default_factory=list)
+
+
+class CsvExportFile:
+    """A gzip compressed CSV file with a header row."""
+
+    extension = 'csv.gz'
+
+    def __init__(self, path: str):
+        self._file = gzip.open(
+            path, 'wt', encoding='utf-8', newline='', compresslevel=6
+        )
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(EXPORT_FIELDS.values())
+
+    def write_rows(self, rows: list[tuple]) -> None:
+        self._writer.writerows(rows)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ParquetExportFile:
+    """A Parquet file with one row group per written chunk of rows."""
+
+    extension = 'parquet'
+
+    def __init__(self, path: str):
+        self._schema = pyarrow.schema([
+            ('id', pyarrow.int64()),
+            ('city_id', pyarrow.int64()),
+            ('city', pyarrow.string()),
+            ('country_code', pyarrow.string()),
+            ('date_time', pyarrow.timestamp('us', tz='UTC')),
+            ('temp', pyarrow.float64()),
+            ('feels_like', pyarrow.float64()),
+            ('pressure', pyarrow.int32()),
+            ('humidity', pyarrow.int32()),
+            ('wind_speed', pyarrow.int32()),
+            ('weather_status', pyarrow.string()),
+            ('weather_description', pyarrow.string()),
+        ])
+        self._writer = pyarrow.parquet.ParquetWriter(
+            path, self._schema, compression='zstd'
+        )
+
+    def write_rows(self, rows: list[tuple]) -> None:
+        self._writer.write_batch(
+            pyarrow.RecordBatch.from_arrays(
+                [
+                    pyarrow.array(column, type=column_field.type)
+                    for column, column_field in zip(zip(*rows), self._schema)
+                ],
+                schema=self._schema
+            )
+        )
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+EXPORT_FORMATS = {'csv': CsvExportFile}
+
+if pyarrow is not None:
+    EXPORT_FORMATS['parquet'] = ParquetExportFile
+
+
+class ForecastsExporter:
+    """
+    Writes the forecasts of a queryset to numbered files of at most
+    rows_per_file rows in a directory. The rows are streamed from
+    a server-side cursor by chunks of chunk_size rows, so only one
+    chunk is held in memory whatever the number of forecasts.
+    """
+
+    def __init__(
+            self, directory: str, export_format: str, rows_per_file: int,
+            chunk_size: int
+    ):
+        self._directory = directory
+        self._file_class = EXPORT_FORMATS[export_format]
+        self._rows_per_file = rows_per_file
+        self._chunk_size = chunk_size
+
+    def _get_path(self, number: int) -> str:
+        return os.path.join(
+            self._directory,
+            f'forecasts-{number:04d}.{self._file_class.extension}'
+        )
+
+    def export(self, forecasts: QuerySet) -> ExportResult:
+        result = ExportResult()
+        rows = forecasts.values_list(*EXPORT_FIELDS).iterator(
+            chunk_size=self._chunk_size
+        )
+        export_file, file_rows_count = None, 0
+
+        try:
+            while True:
+                # A chunk never spans two files.
+                chunk_size = min(
+                    self._chunk_size, self._rows_per_file - file_rows_count
+                )
+
+                if not (chunk := list(islice(rows, chunk_size))):
+                    break
+
+                if export_file is None:
+                    path = self._get_path(len(result.paths) + 1)
+                    export_file = self._file_class(path)
+                    result.paths.append(path)
+
+                export_file.write_rows(chunk)
+                file_rows_count += len(chunk)
+                result.rows_count += len(chunk)
+
+                if file_rows_count == self._rows_per_file:
+                    export_file.close()
+                    export_file, file_rows_count = None, 0
+        finally:
+            if export_file is not None:
+                export_file.close()
+
+        return result
@@ -1,70 +1,102 @@
-import json
-import os
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import Iterable, Iterator
+
+from django.db.models import F, QuerySet
 
 from django_weather_reminder import models
 from django_weather_reminder.openweathermap.parser import OpenWeatherMapParser
-from django_weather_reminder.weather_db.support import converters
+from django_weather_reminder.weather_db.support import converters, geo
+from django_weather_reminder.weather_db.writers import (
+    CityForecastsBatchWriter, CurrentWeatherBatchWriter
+)
 
 
-class UkraineCitiesFromJson:
-    def __init__(self, filepath: str):
-        self._filepath = filepath
-        self._locations_data: None | list = None
-        self._cities_data: list[tuple] = []
+@dataclass
+class FillResult:
+    refreshed: int = 0
+    skipped_fresh: int = 0
+    skipped_unchanged: int = 0
 
-        if not os.path.exists(filepath):
-            raise ValueError('Given directory doesn\'t exists!')
+    def __add__(self, other: 'FillResult') -> 'FillResult':
+        return FillResult(
+            self.refreshed + other.refreshed,
+            self.skipped_fresh + other.skipped_fresh,
+            self.skipped_unchanged + other.skipped_unchanged
+        )
 
-    def _read_file(self) -> None:
-        with open(self._filepath, encoding='utf-8') as file:
-            data = json.load(file)
 
-            self._locations_data = data
+class CitiesWeatherFetcher(ABC):
+    """Base of the fillers which request the weather of many cities."""
 
-    def _parse_cities_data(self) -> None:
-        data_length = len(self._locations_data)
+    def __init__(self, grid_precision: float | None = None):
+        """
+        If grid_precision is given, cities in the same grid cell of
+        grid_precision degrees share a single request to the API.
+        """
 
-        for i, data in enumerate(self._locations_data):
-            print(f'Processing {i + 1} location of {data_length}.')
+        self._parser = OpenWeatherMapParser()
+        self._grid_precision = grid_precision
 
-            if data['type'] != 'CITY':
-                continue
+    @abstractmethod
+    def _get_weather_data(self, city: models.City) -> dict:
+        """Requests the weather data of a city from the API."""
 
-            if not (lat := data['lat']) or not (lon := data['lng']):
-                continue
+    def _group_cities(
+            self, cities: Iterable[models.City]
+    ) -> Iterator[list[models.City]]:
+        if self._grid_precision is None:
+            return ([city] for city in cities)
 
-            self._cities_data.append(
-                (data['name']['en'], lat, lon)
-            )
+        cells = defaultdict(list)
 
-    def _create_city_objects(self) -> None:
-        try:
-            ukraine = models.Country.countries.get(name='Ukraine')
-        except models.Country.DoesNotExist:
-            raise ValueError('First of all - create  Ukraine instance!')
+        for city in cities:
+            cell = geo.get_grid_cell(city.lat, city.lon, self._grid_precision)
+            cells[cell].append(city)
 
-        cities_length = len(self._cities_data)
-        for i, city_data in enumerate(self._cities_data):
-            print(f'Adding a {i + 1} city of {cities_length} to the database.')
+        return iter(cells.values())
 
-            city_name, lat, lon = city_data
+    def _fetch_cities_weather(
+            self, cities: Iterable[models.City], max_workers: int
+    ) -> Iterator[tuple[models.City, dict]]:
+        """
+        Fetches the weather of the given cities in a pool of threads
+        and yields (city, weather data) pairs in order of completion.
+        One request is made per grid cell, or per city without a grid,
+        and its data is yielded for every city of the cell. At most
+        max_workers requests run at the same time and as many wait in
+        the queue, so the cities iterable is consumed lazily unless
+        grouped by grid.
+        """
 
-            models.City.cities.create(
-                name=city_name, lat=lat, lon=lon, country=ukraine
-            )
+        groups = self._group_cities(cities)
 
-        print('The filling was successful.')
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = {
+                executor.submit(self._get_weather_data, group[0]): group
+                for group in islice(groups, max_workers * 2)
+            }
 
-    def write_cities_to_db(self) -> None:
-        self._read_file()
-        self._parse_cities_data()
-        self._create_city_objects()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
 
+                for future in done:
+                    group = pending.pop(future)
+                    weather_data = future.result()
 
-class CurrentWeather:
-    def __init__(self):
-        self._parser = OpenWeatherMapParser()
+                    for city in group:
+                        yield city, weather_data
+
+                for group in islice(groups, len(done)):
+                    future = executor.submit(self._get_weather_data, group[0])
+                    pending[future] = group
 
+
+class CurrentWeather(CitiesWeatherFetcher):
     def _get_weather_data(self, city) -> dict:
         current_weather_data = self._parser.parse_city_current_weather(
             city.lat, city.lon
@@ -87,6 +119,185 @@ class CurrentWeather:
             weather_data['wind_speed'], city
         )
 
+    @staticmethod
+    def _build_weather(
+            weather_data: dict, city: models.City
+    ) -> models.CurrentWeather:
+        forecast_date_time = converters.convert_unix_time_to_datetime(
+            weather_data['date_time']
+        )
+        return models.CurrentWeather(
+            weather_status=weather_data['weather_status'],
+            weather_description=weather_data['weather_description'],
+            date_time=forecast_date_time, temp=weather_data['temp'],
+            feels_like=weather_data['feels_like'],
+            pressure=weather_data['pressure'],
+            humidity=weather_data['humidity'],
+            wind_speed=weather_data['wind_speed'], city=city
+        )
+
     def fill_city_weather(self, city: models.City) -> None:
         current_weather_data = self._get_weather_data(city)
         self._create_weather(current_weather_data, city)
+
+    @staticmethod
+    def _skip_fresh_cities(
+            cities: Iterable[models.City], fresh_ttl: timedelta | None,
+            result: FillResult
+    ) -> Iterator[models.City]:
+        if fresh_ttl is None:
+            yield from cities
+
+            return None
+
+        fresh_since = datetime.now(tz=timezone.utc) - fresh_ttl
+
+        for city in cities:
+            if city.latest_observation and (
+                    city.latest_observation >= fresh_since
+            ):
+                result.skipped_fresh += 1
+            else:
+                yield city
+
+    def fill_cities_weather(
+            self, cities: QuerySet[models.City], max_workers: int = 1,
+            batch_size: int = 1, fresh_ttl: timedelta | None = None
+    ) -> FillResult:
+        """
+        Fills the current weather of the given cities, sending up to
+        max_workers requests concurrently. Forecasts are written as their
+        responses arrive, in bulk inserts of batch_size forecasts.
+
+        Cities whose latest stored observation is younger than fresh_ttl
+        are not requested at all, and a forecast is not written if the API
+        has no newer observation than the stored one.
+        """
+
+        result = FillResult()
+
+        cities = cities.annotate(
+            latest_observation=F('latest_forecast__date_time')
+        )
+        stale_cities = self._skip_fresh_cities(cities, fresh_ttl, result)
+
+        with CurrentWeatherBatchWriter(batch_size) as writer:
+            for city, weather_data in self._fetch_cities_weather(
+                    stale_cities, max_workers
+            ):
+                forecast = self._build_weather(weather_data, city)
+
+                if city.latest_observation and (
+                        forecast.date_time <= city.latest_observation
+                ):
+                    result.skipped_unchanged += 1
+                else:
+                    writer.add(forecast)
+
+        result.refreshed = writer.written_count
+
+        return result
+
+    def fill_cities_weather_in_chunks(
+            self, cities: QuerySet[models.City], chunk_size: int,
+            max_workers: int = 1, batch_size: int = 1,
+            fresh_ttl: timedelta | None = None, limit: int | None = None
+    ) -> Iterator[tuple[int, FillResult]]:
+        """
+        Fills the current weather of the given cities, at most limit
+        of them, chunk by chunk in primary key order, streaming their ids
+        from the database. Yields the last primary key of every chunk
+        with its result once all its forecasts are written, so a run
+        can be resumed after it.
+        """
+
+        cities_ids = cities.order_by('pk').values_list('pk', flat=True)
+
+        if limit:
+            cities_ids = cities_ids[:limit]
+
+        cities_ids = cities_ids.iterator(chunk_size=chunk_size)
+
+        while chunk_ids := list(islice(cities_ids, chunk_size)):
+            result = self.fill_cities_weather(
+                models.City.cities.filter(pk__in=chunk_ids), max_workers,
+                batch_size, fresh_ttl
+            )
+
+            yield chunk_ids[-1], result
+
+
+class CityForecasts(CitiesWeatherFetcher):
+    """Fills the hourly and daily forecasts of cities."""
+
+    def _get_weather_data(self, city: models.City) -> dict:
+        weather_forecasts = self._parser.parse_city_weather_forecast(
+            city.lat, city.lon
+        )
+
+        return weather_forecasts
+
+    @staticmethod
+    def _build_hourly_forecast(
+            forecast_data: dict, city: models.City
+    ) -> models.HourlyForecast:
+        return models.HourlyForecast(
+            weather_status=forecast_data['weather_status'],
+            weather_description=forecast_data['weather_description'],
+            date_time=converters.convert_unix_time_to_datetime(
+                forecast_data['date_time']
+            ),
+            temp=forecast_data['temp'],
+            feels_like=forecast_data['feels_like'],
+            pressure=forecast_data['pressure'],
+            humidity=forecast_data['humidity'],
+            wind_speed=forecast_data['wind_speed'], city=city
+        )
+
+    @staticmethod
+    def _build_daily_forecast(
+            forecast_data: dict, city: models.City
+    ) -> models.DailyForecast:
+        return models.DailyForecast(
+            weather_status=forecast_data['weather_status'],
+            weather_description=forecast_data['weather_description'],
+            date_time=converters.convert_unix_time_to_datetime(
+                forecast_data['date_time']
+            ),
+            temp=forecast_data['temp']['day'],
+            temp_min=forecast_data['temp']['min'],
+            temp_max=forecast_data['temp']['max'],
+            feels_like=forecast_data['feels_like']['day'],
+            pressure=forecast_data['pressure'],
+            humidity=forecast_data['humidity'],
+            wind_speed=forecast_data['wind_speed'], city=city
+        )
+
+    def fill_cities_forecasts(
+            self, cities: Iterable[models.City], max_workers: int = 1,
+            batch_size: int = 1
+    ) -> int:
+        """
+        Fills the hourly and daily forecasts of the given cities, sending
+        up to max_workers requests concurrently. Forecasts are upserted
+        by (city, date_time) in statements of about batch_size rows,
+        and the outdated ones are deleted. Returns the number of cities.
+        """
+
+        with CityForecastsBatchWriter(batch_size) as writer:
+            for city, forecasts_data in self._fetch_cities_weather(
+                    cities, max_workers
+            ):
+                writer.add(
+                    city,
+                    [
+                        self._build_hourly_forecast(forecast_data, city)
+                        for forecast_data in forecasts_data['hourly_forecasts']
+                    ],
+                    [
+                        self._build_daily_forecast(forecast_data, city)
+                        for forecast_data in forecasts_data['daily_forecasts']
+                    ]
+                )
+
+        return writer.cities_count
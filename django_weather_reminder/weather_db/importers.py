@@ -0,0 +1,255 @@
+import csv
+import os
+from dataclasses import dataclass
+from itertools import islice
+from typing import Iterable, Iterator
+
+from django.db import transaction
+
+from django_weather_reminder import models
+from django_weather_reminder.api.cache import (
+    invalidate_cities_geometry, invalidate_locations
+)
+from django_weather_reminder.weather_db.support.json_stream import (
+    iter_json_array
+)
+from django_weather_reminder.weather_db.support.upsert import bulk_upsert
+
+# GeoNames dump columns, see https://download.geonames.org/export/dump/.
+GEONAMES_NAME, GEONAMES_LAT, GEONAMES_LON = 1, 4, 5
+GEONAMES_FEATURE_CLASS, GEONAMES_COUNTRY_CODE = 6, 8
+GEONAMES_POPULATED_PLACE = 'P'
+
+
+@dataclass(frozen=True)
+class CityLocation:
+    name: str
+    lat: float
+    lon: float
+    country_code: str
+
+
+@dataclass
+class ImportResult:
+    processed: int = 0
+    imported: int = 0
+
+    def __add__(self, other: 'ImportResult') -> 'ImportResult':
+        return ImportResult(
+            self.processed + other.processed, self.imported + other.imported
+        )
+
+
+def read_json_locations(
+        filepath: str, country_code: str
+) -> Iterator[CityLocation]:
+    """
+    Streams the cities of a JSON array of locations, shaped like
+    {"type": "CITY", "name": {"en": ...}, "lat": ..., "lng": ...}.
+    Other types and locations without coordinates are skipped.
+    """
+
+    with open(filepath, encoding='utf-8') as file:
+        for location in iter_json_array(file):
+            if location['type'] != 'CITY':
+                continue
+
+            if not (lat := location['lat']) or not (lon := location['lng']):
+                continue
+
+            yield CityLocation(location['name']['en'], lat, lon, country_code)
+
+
+def read_csv_locations(
+        filepath: str, country_code: str | None = None
+) -> Iterator[CityLocation]:
+    """
+    Streams the cities of a CSV file with a header of name, lat, lon
+    and an optional country_code column overriding the given code.
+    """
+
+    with open(filepath, encoding='utf-8', newline='') as file:
+        for row in csv.DictReader(file):
+            code = row.get('country_code') or country_code
+
+            if not code:
+                raise ValueError(f'No country code for {row["name"]}!')
+
+            yield CityLocation(
+                row['name'], float(row['lat']), float(row['lon']), code
+            )
+
+
+def read_geonames_locations(filepath: str) -> Iterator[CityLocation]:
+    """Streams the populated places of a GeoNames dump file."""
+
+    with open(filepath, encoding='utf-8', newline='') as file:
+        for row in csv.reader(
+                file, delimiter='\t', quoting=csv.QUOTE_NONE
+        ):
+            if row[GEONAMES_FEATURE_CLASS] != GEONAMES_POPULATED_PLACE:
+                continue
+
+            yield CityLocation(
+                row[GEONAMES_NAME], float(row[GEONAMES_LAT]),
+                float(row[GEONAMES_LON]), row[GEONAMES_COUNTRY_CODE]
+            )
+
+
+def create_countries(
+        codes: Iterable[str], country_names: dict[str, str] | None = None
+) -> None:
+    """
+    Creates the missing countries of the given codes in a short
+    transaction of its own, named by country_names or else after their
+    code. They are inserted in the order of their codes, so concurrent
+    callers lock them in the same order.
+    """
+
+    country_names = country_names or {}
+    codes = sorted(set(codes))
+
+    with transaction.atomic():
+        bulk_upsert(
+            models.Country(name=country_names.get(code, code), code=code)
+            for code in codes
+        )
+
+    if missing_codes := set(codes) - set(
+            models.Country.countries.filter(
+                code__in=codes
+            ).values_list('code', flat=True)
+    ):
+        raise ValueError(
+            f'Countries {", ".join(sorted(missing_codes))} have the '
+            'name of another country!'
+        )
+
+
+class CitiesImporter:
+    """
+    Imports cities of existing countries by chunked upserts in a single
+    transaction. Cities already stored with the same name and location
+    are left as they are, so an import can be run again. The countries
+    are created by create_countries beforehand, as creating them in the
+    long transaction would lock them against parallel imports.
+    """
+
+    def __init__(self, chunk_size: int, progress_every: int):
+        self._chunk_size = chunk_size
+        self._progress_every = progress_every
+        self._countries_ids: dict[str, int] = {}
+
+    def _resolve_countries(self, codes: set[str]) -> None:
+        if not (new_codes := codes - self._countries_ids.keys()):
+            return
+
+        self._countries_ids |= dict(
+            models.Country.countries.filter(
+                code__in=new_codes
+            ).values_list('code', 'pk')
+        )
+
+        if missing_codes := new_codes - self._countries_ids.keys():
+            raise ValueError(
+                f'Countries {", ".join(sorted(missing_codes))} '
+                "don't exist!"
+            )
+
+    def _build_cities(
+            self, locations: Iterable[CityLocation]
+    ) -> list[models.City]:
+        return [
+            models.City(
+                name=location.name, lat=location.lat, lon=location.lon,
+                country_id=self._countries_ids[location.country_code]
+            )
+            for location in locations
+        ]
+
+    def import_cities(
+            self, locations: Iterable[CityLocation], source: str = 'Import'
+    ) -> ImportResult:
+        result = ImportResult()
+        locations = iter(locations)
+        next_progress = self._progress_every
+
+        with transaction.atomic():
+            while chunk := list(islice(locations, self._chunk_size)):
+                self._resolve_countries(
+                    {location.country_code for location in chunk}
+                )
+
+                result.imported += bulk_upsert(
+                    self._build_cities(chunk),
+                    ('country', 'name', 'lat', 'lon')
+                )
+                result.processed += len(chunk)
+
+                if result.processed >= next_progress:
+                    print(
+                        f'{source}: processed {result.processed} cities, '
+                        f'imported {result.imported}.'
+                    )
+                    next_progress += self._progress_every
+
+        if result.imported:
+            invalidate_locations()
+            invalidate_cities_geometry()
+
+        return result
+
+
+def read_locations(
+        filepath: str, country_code: str | None = None
+) -> Iterator[CityLocation]:
+    """
+    Streams the cities of a JSON, CSV or GeoNames (.txt or .tsv) file,
+    chosen by its extension. JSON files need the country code.
+    """
+
+    extension = os.path.splitext(filepath)[1].lower()
+
+    if extension == '.json':
+        if not country_code:
+            raise ValueError('JSON locations need a country code!')
+
+        return read_json_locations(filepath, country_code)
+
+    if extension == '.csv':
+        return read_csv_locations(filepath, country_code)
+
+    if extension in ('.txt', '.tsv'):
+        return read_geonames_locations(filepath)
+
+    raise ValueError(f'Unsupported locations file {filepath}!')
+
+
+def read_country_codes(
+        filepath: str, country_code: str | None = None
+) -> set[str]:
+    """
+    Returns the country codes of the cities of a file, usable as
+    a worker process job.
+    """
+
+    return {
+        location.country_code
+        for location in read_locations(filepath, country_code)
+    }
+
+
+def import_locations_file(
+        filepath: str, country_code: str | None, chunk_size: int,
+        progress_every: int
+) -> ImportResult:
+    """
+    Imports the cities of a file, usable as a worker process job.
+    Their countries must be created beforehand.
+    """
+
+    importer = CitiesImporter(chunk_size, progress_every)
+
+    return importer.import_cities(
+        read_locations(filepath, country_code), os.path.basename(filepath)
+    )
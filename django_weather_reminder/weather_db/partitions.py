@@ -0,0 +1,245 @@
+from datetime import date, datetime, time, timezone
+
+from django.db import connection, transaction
+
+from django_weather_reminder import models
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_bounds(month: date) -> tuple[datetime, datetime]:
+    """Returns the first moment of a month and of the next one, in UTC."""
+
+    return tuple(
+        datetime.combine(day, time.min, tzinfo=timezone.utc)
+        for day in (month, add_months(month, 1))
+    )
+
+
+class ForecastPartitions:
+    """
+    Monthly range partitions of the current weather forecasts by date_time.
+    Partitioning is optional: the table stays a plain one until convert
+    is called, and is_partitioned tells which one it is. The partitions
+    are named after their month, a default partition takes the forecasts
+    of the months without one.
+    """
+
+    def __init__(self):
+        self._table = models.CurrentWeather._meta.db_table
+        self._quote = connection.ops.quote_name
+
+    @property
+    def default_partition(self) -> str:
+        return f'{self._table}_default'
+
+    def _get_partition(self, month: date) -> str:
+        return f'{self._table}_p{month:%Y%m}'
+
+    def _get_month(self, partition: str) -> date | None:
+        try:
+            return datetime.strptime(
+                partition.removeprefix(f'{self._table}_p'), '%Y%m'
+            ).date()
+        except ValueError:
+            return None
+
+    def is_partitioned(self) -> bool:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT EXISTS (SELECT 1 FROM pg_partitioned_table '
+                'WHERE partrelid = to_regclass(%s))',
+                [self._table]
+            )
+
+            return cursor.fetchone()[0]
+
+    def get_months(self) -> list[date]:
+        """Returns the months of the monthly partitions, in order."""
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT partition.relname FROM pg_inherits '
+                'JOIN pg_class AS partition '
+                '  ON partition.oid = pg_inherits.inhrelid '
+                'WHERE pg_inherits.inhparent = to_regclass(%s)',
+                [self._table]
+            )
+            partitions = [row[0] for row in cursor.fetchall()]
+
+        return sorted(filter(None, map(self._get_month, partitions)))
+
+    def create(self, month: date) -> bool:
+        """
+        Creates the partition of a month, unless it exists, moving
+        the forecasts of that month out of the default partition.
+        Returns whether the partition was created.
+        """
+
+        if month in self.get_months():
+            return False
+
+        partition = self._quote(self._get_partition(month))
+        start, end = month_bounds(month)
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TABLE {partition} (LIKE {self._quote(self._table)} '
+                'INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+            )
+            cursor.execute(
+                'WITH moved AS ('
+                f' DELETE FROM {self._quote(self.default_partition)}'
+                ' WHERE date_time >= %s AND date_time < %s RETURNING *'
+                f') INSERT INTO {partition} SELECT * FROM moved',
+                [start, end]
+            )
+            cursor.execute(
+                f'ALTER TABLE {self._quote(self._table)} '
+                f'ATTACH PARTITION {partition} FOR VALUES FROM (%s) TO (%s)',
+                [start, end]
+            )
+
+        return True
+
+    def create_ahead(self, months_ahead: int) -> list[date]:
+        """
+        Creates the missing partitions of the current month and of
+        months_ahead next months. Returns the months of the created ones.
+        """
+
+        current_month = datetime.now(tz=timezone.utc).date().replace(day=1)
+        months = [
+            add_months(current_month, i) for i in range(months_ahead + 1)
+        ]
+
+        return [month for month in months if self.create(month)]
+
+    def get_expired(self, cutoff: datetime) -> list[date]:
+        """Returns the months of the partitions ending before cutoff."""
+
+        return [
+            month for month in self.get_months()
+            if month_bounds(month)[1] <= cutoff
+        ]
+
+    def drop_expired(self, cutoff: datetime) -> int:
+        """
+        Drops the partitions ending before cutoff. The latest forecasts
+        of the cities are moved to the default partition beforehand.
+        Returns the number of dropped partitions.
+        """
+
+        expired_months = self.get_expired(cutoff)
+        city_table = self._quote(models.City._meta.db_table)
+
+        for month in expired_months:
+            partition = self._quote(self._get_partition(month))
+
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(
+                    f'ALTER TABLE {self._quote(self._table)} '
+                    f'DETACH PARTITION {partition}'
+                )
+                cursor.execute(
+                    f'INSERT INTO {self._quote(self._table)} '
+                    f'SELECT * FROM {partition} AS forecast '
+                    f'WHERE EXISTS (SELECT 1 FROM {city_table} '
+                    ' WHERE latest_forecast_id = forecast.id)'
+                )
+                cursor.execute(f'DROP TABLE {partition}')
+
+        return len(expired_months)
+
+    def convert(self, months_ahead: int) -> list[date]:
+        """
+        Turns the plain forecasts table into a partitioned one with the
+        same columns, indexes and constraints, keeping the forecasts.
+        The primary key becomes (id, date_time), as the key of
+        a partitioned table has to contain its partitioning column.
+        Partitions are created from the month of the first forecast to
+        months_ahead months after the current one. The table is locked
+        until all forecasts are copied. Returns the partitions' months.
+        """
+
+        table = self._quote(self._table)
+        legacy_table = self._quote(f'{self._table}_legacy')
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT indexdef FROM pg_indexes '
+                'WHERE schemaname = current_schema() AND tablename = %s '
+                'AND indexname NOT IN ('
+                ' SELECT conname FROM pg_constraint'
+                ' WHERE conrelid = to_regclass(%s) AND contype = %s'
+                ')',
+                [self._table, self._table, 'p']
+            )
+            index_definitions = [row[0] for row in cursor.fetchall()]
+
+            cursor.execute(
+                'SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint '
+                'WHERE conrelid = to_regclass(%s) AND contype = %s',
+                [self._table, 'f']
+            )
+            foreign_keys = cursor.fetchall()
+
+            cursor.execute(
+                'SELECT pg_get_serial_sequence(%s, %s), MIN(date_time) '
+                f'FROM {table}',
+                [self._table, 'id']
+            )
+            sequence, first_date_time = cursor.fetchone()
+
+            cursor.execute(f'ALTER TABLE {table} RENAME TO {legacy_table}')
+            cursor.execute(
+                f'CREATE TABLE {table} (LIKE {legacy_table} '
+                'INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+                'PARTITION BY RANGE (date_time)'
+            )
+            cursor.execute(
+                f'CREATE TABLE {self._quote(self.default_partition)} '
+                f'PARTITION OF {table} DEFAULT'
+            )
+
+            current_month = datetime.now(tz=timezone.utc).date().replace(
+                day=1
+            )
+            month = current_month
+
+            if first_date_time is not None:
+                month = min(
+                    month,
+                    first_date_time.astimezone(timezone.utc).date().replace(
+                        day=1
+                    )
+                )
+
+            while month <= add_months(current_month, months_ahead):
+                self.create(month)
+                month = add_months(month, 1)
+
+            cursor.execute(
+                f'INSERT INTO {table} SELECT * FROM {legacy_table}'
+            )
+            cursor.execute(f'ALTER SEQUENCE {sequence} OWNED BY {table}.id')
+            cursor.execute(f'DROP TABLE {legacy_table}')
+
+            cursor.execute(
+                f'ALTER TABLE {table} ADD PRIMARY KEY (id, date_time)'
+            )
+
+            for index_definition in index_definitions:
+                cursor.execute(index_definition)
+
+            for name, definition in foreign_keys:
+                cursor.execute(
+                    f'ALTER TABLE {table} '
+                    f'ADD CONSTRAINT {self._quote(name)} {definition}'
+                )
+
+        return self.get_months()
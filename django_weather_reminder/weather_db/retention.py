@@ -0,0 +1,126 @@
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+
+from django.db.models import Max, Min
+
+from django_weather_reminder import models
+from django_weather_reminder.weather_db.partitions import ForecastPartitions
+
+
+@dataclass
+class RetentionResult:
+    expired_days: int = 0
+    summaries_count: int = 0
+    deleted_count: int = 0
+    dropped_partitions: int = 0
+
+
+class ForecastRetention:
+    """
+    Keeps the hourly forecasts of the last keep_days full days.
+    Older forecasts are rolled into daily weather summaries and then
+    deleted by chunks of chunk_size rows. Only full UTC days expire,
+    so a summary is always built from all forecasts of its day.
+    If the forecasts table is partitioned, the expired forecasts are
+    dropped with their monthly partitions instead, so they are kept
+    until their whole month expires. Only the default partition
+    is deleted by chunks then.
+    """
+
+    def __init__(self, keep_days: int, chunk_size: int):
+        self._keep_days = keep_days
+        self._chunk_size = chunk_size
+        self._partitions = ForecastPartitions()
+
+    def _get_cutoff_day(self) -> date:
+        return datetime.now(tz=timezone.utc).date() - timedelta(
+            days=self._keep_days
+        )
+
+    @staticmethod
+    def _get_first_day() -> date | None:
+        """
+        Returns the first day to summarize: the day of the first forecast,
+        but never a day up to the last summary. The latest forecasts of
+        the cities are never deleted, so the first forecast alone would
+        make every run summarize every day since the oldest of them.
+        """
+
+        first_date_time = models.CurrentWeather.forecasts.aggregate(
+            first=Min('date_time')
+        )['first']
+
+        if first_date_time is None:
+            return None
+
+        first_day = first_date_time.astimezone(timezone.utc).date()
+        last_summary_day = models.DailyWeather.summaries.aggregate(
+            last=Max('date')
+        )['last']
+
+        if last_summary_day is None:
+            return first_day
+
+        return max(first_day, last_summary_day + timedelta(days=1))
+
+    def _get_expired_days(self) -> list[date]:
+        first_day, cutoff_day = self._get_first_day(), self._get_cutoff_day()
+
+        if first_day is None:
+            return []
+
+        return [
+            first_day + timedelta(days=i)
+            for i in range((cutoff_day - first_day).days)
+        ]
+
+    def _get_cutoff(self) -> datetime:
+        return datetime.combine(
+            self._get_cutoff_day(), time.min, tzinfo=timezone.utc
+        )
+
+    def estimate(self) -> RetentionResult:
+        """Returns what apply would do, without changing anything."""
+
+        if self._partitions.is_partitioned():
+            cutoff = self._get_cutoff()
+
+            return RetentionResult(
+                expired_days=len(self._get_expired_days()),
+                deleted_count=models.CurrentWeather.forecasts.count_older_than(
+                    cutoff, self._partitions.default_partition
+                ),
+                dropped_partitions=len(self._partitions.get_expired(cutoff))
+            )
+
+        return RetentionResult(
+            expired_days=len(self._get_expired_days()),
+            deleted_count=models.CurrentWeather.forecasts.filter(
+                date_time__lt=self._get_cutoff(),
+                latest_for_city__isnull=True
+            ).count()
+        )
+
+    def apply(self) -> RetentionResult:
+        result = RetentionResult()
+
+        for day in self._get_expired_days():
+            result.summaries_count += (
+                models.CurrentWeather.forecasts.summarize_day(day)
+            )
+            result.expired_days += 1
+
+        cutoff, table = self._get_cutoff(), None
+
+        if self._partitions.is_partitioned():
+            result.dropped_partitions = self._partitions.drop_expired(cutoff)
+            table = self._partitions.default_partition
+
+        deleted_chunks = models.CurrentWeather.forecasts.delete_older_than(
+            cutoff, self._chunk_size, table
+        )
+
+        for deleted_count in deleted_chunks:
+            result.deleted_count += deleted_count
+
+        return result
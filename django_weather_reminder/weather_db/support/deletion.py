@@ -0,0 +1,72 @@
+import time
+from typing import Iterable, Iterator, Sequence
+
+from django.db import connection, models
+
+
+def delete_in_pk_ranges(
+        model: type[models.Model], chunk_size: int,
+        condition: str = 'TRUE', params: Sequence = ()
+) -> Iterator[int]:
+    """
+    Deletes the rows of a model matching a raw SQL condition, without
+    loading them or sending signals, by one DELETE per range of
+    chunk_size primary keys, so locks are held only briefly.
+    Yields the number of rows deleted by every range.
+    """
+
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    pk = quote(model._meta.pk.column)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT MIN({pk}), MAX({pk}) FROM {table} WHERE {condition}',
+            params
+        )
+        min_pk, max_pk = cursor.fetchone()
+
+    if min_pk is None:
+        return None
+
+    for start in range(min_pk, max_pk + 1, chunk_size):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {table} '
+                f'WHERE {pk} >= %s AND {pk} < %s AND ({condition})',
+                [start, start + chunk_size, *params]
+            )
+
+            yield cursor.rowcount
+
+
+def report_deletion(
+        deleted_counts: Iterable[int], label: str, every: float = 5
+) -> int:
+    """
+    Consumes the deleted counts of a chunked deletion, printing
+    the progress and the throughput at most every given seconds.
+    Returns the total number of deleted rows.
+    """
+
+    total = 0
+    started = reported = time.perf_counter()
+
+    for deleted_count in deleted_counts:
+        total += deleted_count
+
+        if (now := time.perf_counter()) - reported >= every:
+            print(
+                f'{label}: {total} deleted, '
+                f'{total / (now - started):.0f} rows/s.'
+            )
+            reported = now
+
+    elapsed = time.perf_counter() - started
+
+    print(
+        f'{label}: {total} deleted in {elapsed:.1f} s, '
+        f'{total / max(elapsed, 1e-6):.0f} rows/s.'
+    )
+
+    return total
@@ -0,0 +1,38 @@
+import math
+
+
+def get_grid_cell(lat: float, lon: float, precision: float) -> tuple[int, int]:
+    """
+    Returns the indices of the grid cell containing the given point,
+    for a grid of precision x precision degrees cells.
+    """
+
+    return math.floor(lat / precision), math.floor(lon / precision)
+
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def to_unit_vector(lat: float, lon: float) -> tuple[float, float, float]:
+    """
+    Returns the point of the unit sphere at the given coordinates.
+    The straight distance between two such points grows with the
+    great-circle distance between the coordinates.
+    """
+
+    lat, lon = math.radians(lat), math.radians(lon)
+
+    return (
+        math.cos(lat) * math.cos(lon),
+        math.cos(lat) * math.sin(lon),
+        math.sin(lat)
+    )
+
+
+def chord_to_km(chord: float) -> float:
+    """
+    Returns the great-circle distance on Earth for a straight distance
+    between two points of the unit sphere.
+    """
+
+    return 2 * math.asin(min(chord / 2, 1)) * EARTH_RADIUS_KM
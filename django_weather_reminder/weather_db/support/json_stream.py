@@ -0,0 +1,45 @@
+import json
+import re
+from typing import Any, Iterator, TextIO
+
+_decoder = json.JSONDecoder()
+_SEPARATORS = re.compile(r'[\s,]*')
+
+
+def iter_json_array(file: TextIO, read_size: int = 1 << 16) -> Iterator[Any]:
+    """
+    Yields the items of the JSON array of a file one by one, holding
+    only a read buffer and the current item in memory.
+    """
+
+    buffer = file.read(read_size).lstrip()
+
+    if not buffer.startswith('['):
+        raise ValueError('The file doesn\'t contain a JSON array!')
+
+    position, eof = 1, False
+
+    while True:
+        position = _SEPARATORS.match(buffer, position).end()
+
+        if buffer.startswith(']', position):
+            return
+
+        try:
+            item, end = _decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            item, end = None, None
+
+        # A decoded item running to the buffer end may be cut, like 12
+        # of 123, unless the whole file has been read.
+        if end is not None and (end < len(buffer) or eof):
+            yield item
+            position = end
+            continue
+
+        if eof:
+            raise ValueError('The file contains an incomplete JSON array!')
+
+        chunk = file.read(read_size)
+        eof = not chunk
+        buffer, position = buffer[position:] + chunk, 0
@@ -0,0 +1,74 @@
+import heapq
+from typing import Sequence
+
+Point = tuple[float, ...]
+
+
+class KDTree:
+    """
+    Static k-d tree of points with ids. The tree is stored implicitly:
+    the middle item of every slice is the node splitting the slice
+    on the axis of its depth.
+    """
+
+    def __init__(self, points: Sequence[Point], ids: Sequence[int]):
+        self._items = list(zip(points, ids))
+        self._dimensions = len(points[0]) if points else 0
+
+        self._build(0, len(self._items), 0)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def _build(self, lo: int, hi: int, depth: int) -> None:
+        if hi - lo <= 1:
+            return
+
+        axis = depth % self._dimensions
+        self._items[lo:hi] = sorted(
+            self._items[lo:hi], key=lambda item: item[0][axis]
+        )
+        middle = (lo + hi) // 2
+
+        self._build(lo, middle, depth + 1)
+        self._build(middle + 1, hi, depth + 1)
+
+    def nearest(self, point: Point, k: int) -> list[tuple[float, int]]:
+        """
+        Returns the squared distances and the ids of the k points
+        nearest to the given one, the nearest first.
+        """
+
+        heap: list[tuple[float, int]] = []
+
+        def search(lo: int, hi: int, depth: int) -> None:
+            if lo >= hi:
+                return
+
+            middle = (lo + hi) // 2
+            node_point, node_id = self._items[middle]
+
+            distance = sum((a - b) ** 2 for a, b in zip(point, node_point))
+
+            if len(heap) < k:
+                heapq.heappush(heap, (-distance, node_id))
+            elif distance < -heap[0][0]:
+                heapq.heapreplace(heap, (-distance, node_id))
+
+            axis = depth % self._dimensions
+            diff = point[axis] - node_point[axis]
+
+            if diff < 0:
+                near, far = (lo, middle), (middle + 1, hi)
+            else:
+                near, far = (middle + 1, hi), (lo, middle)
+
+            search(*near, depth + 1)
+
+            if len(heap) < k or diff * diff < -heap[0][0]:
+                search(*far, depth + 1)
+
+        if k > 0:
+            search(0, len(self._items), 0)
+
+        return sorted((-distance, id_) for distance, id_ in heap)
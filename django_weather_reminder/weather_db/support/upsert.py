@@ -0,0 +1,60 @@
+from typing import Iterable
+
+from django.db import connection, models
+
+
+def bulk_upsert(
+        objs: Iterable[models.Model], conflict_fields: Iterable[str] = (),
+        update_fields: Iterable[str] | None = None
+) -> int:
+    """
+    Inserts the given objects of a single model with one statement.
+    A row conflicting on conflict_fields has its update_fields updated,
+    or is skipped if update_fields isn't given. Without conflict_fields
+    a row conflicting on any unique constraint is skipped. Returns the
+    number of inserted or updated rows.
+    """
+
+    objs = list(objs)
+
+    if not objs:
+        return 0
+
+    opts = objs[0]._meta
+    fields = [
+        field for field in opts.concrete_fields
+        if not isinstance(field, models.AutoField)
+    ]
+    quote = connection.ops.quote_name
+
+    columns = ', '.join(quote(field.column) for field in fields)
+    row_placeholder = f'({", ".join(["%s"] * len(fields))})'
+    conflict_columns = ', '.join(
+        quote(opts.get_field(name).column) for name in conflict_fields
+    )
+    conflict_target = f'({conflict_columns}) ' if conflict_columns else ''
+
+    if update_fields:
+        updated_columns = [
+            quote(opts.get_field(name).column) for name in update_fields
+        ]
+        conflict_action = 'DO UPDATE SET ' + ', '.join(
+            f'{column} = EXCLUDED.{column}' for column in updated_columns
+        )
+    else:
+        conflict_action = 'DO NOTHING'
+
+    params = [
+        field.get_db_prep_save(field.pre_save(obj, add=True), connection)
+        for obj in objs for field in fields
+    ]
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {quote(opts.db_table)} ({columns}) '
+            f'VALUES {", ".join([row_placeholder] * len(objs))} '
+            f'ON CONFLICT {conflict_target}{conflict_action}',
+            params
+        )
+
+        return cursor.rowcount
@@ -0,0 +1,100 @@
+from datetime import datetime, timezone
+
+from django_weather_reminder import models
+
+
+class CurrentWeatherBatchWriter:
+    """
+    Collects current weather forecasts and writes them with one bulk INSERT
+    per chunk of chunk_size forecasts, every chunk in its own transaction.
+    The last incomplete chunk is written on flush or when leaving
+    the writer's context without an error.
+    """
+
+    def __init__(self, chunk_size: int):
+        self._chunk_size = chunk_size
+        self._forecasts: list[models.CurrentWeather] = []
+
+        self.written_count = 0
+
+    def add(self, forecast: models.CurrentWeather) -> None:
+        self._forecasts.append(forecast)
+
+        if len(self._forecasts) >= self._chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._forecasts:
+            return None
+
+        models.CurrentWeather.forecasts.bulk_create_forecasts(self._forecasts)
+
+        self.written_count += len(self._forecasts)
+        self._forecasts = []
+
+    def __enter__(self) -> 'CurrentWeatherBatchWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if exc_type is None:
+            self.flush()
+
+
+class CityForecastsBatchWriter:
+    """
+    Collects the hourly and daily forecasts of cities and upserts them
+    once at least chunk_size forecasts are collected. The stored forecasts
+    of these cities which are already in the past are deleted.
+    """
+
+    def __init__(self, chunk_size: int):
+        self._chunk_size = chunk_size
+        self._cities_ids: list[int] = []
+        self._hourly_forecasts: list[models.HourlyForecast] = []
+        self._daily_forecasts: list[models.DailyForecast] = []
+
+        self.cities_count = 0
+
+    def add(
+            self, city: models.City,
+            hourly_forecasts: list[models.HourlyForecast],
+            daily_forecasts: list[models.DailyForecast]
+    ) -> None:
+        self._cities_ids.append(city.pk)
+        self._hourly_forecasts.extend(hourly_forecasts)
+        self._daily_forecasts.extend(daily_forecasts)
+
+        collected_count = (
+            len(self._hourly_forecasts) + len(self._daily_forecasts)
+        )
+
+        if collected_count >= self._chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._cities_ids:
+            return None
+
+        now = datetime.now(tz=timezone.utc)
+
+        models.HourlyForecast.forecasts.upsert_forecasts(
+            self._hourly_forecasts, self._cities_ids,
+            now.replace(minute=0, second=0, microsecond=0)
+        )
+        models.DailyForecast.forecasts.upsert_forecasts(
+            self._daily_forecasts, self._cities_ids,
+            now.replace(hour=0, minute=0, second=0, microsecond=0)
+        )
+
+        self.cities_count += len(self._cities_ids)
+
+        self._cities_ids = []
+        self._hourly_forecasts = []
+        self._daily_forecasts = []
+
+    def __enter__(self) -> 'CityForecastsBatchWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if exc_type is None:
+            self.flush()